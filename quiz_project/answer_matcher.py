@@ -0,0 +1,35 @@
+from rapidfuzz import fuzz, process
+
+from quiz_model import normalize_answer
+
+
+class AnswerMatcher:
+    """Fuzzy matches a user's answer against all accepted answers in a single rapidfuzz call.
+
+    Shared by the CLI, GUI and speech paths so that every mode accepts exactly the same
+    answers for the same fuzzy_search_threshold. Accepted answers are expected to be
+    pre-normalized (see quiz_model.AnswerPart); only the user's input is normalized here.
+    """
+
+    def __init__(self, threshold=80):
+        self.threshold = threshold
+
+    def best_match(self, user_input, normalized_answers):
+        """Returns (index, score) of the best accepted answer, or None if nothing reaches the threshold."""
+        result = process.extractOne(normalize_answer(user_input), normalized_answers,
+                                    scorer=fuzz.ratio, score_cutoff=self.threshold)
+        if result is None:
+            return None
+        answer, score, index = result
+        return index, score
+
+    def all_matches(self, user_input, normalized_answers):
+        """Returns (index, score) for every accepted answer that reaches the threshold, best first."""
+        return [(index, score) for answer, score, index in
+                process.extract(normalize_answer(user_input), normalized_answers, scorer=fuzz.ratio,
+                                score_cutoff=self.threshold, limit=None)]
+
+    def is_match(self, user_input, answer):
+        """Checks a single raw answer, e.g. during practice."""
+        score = fuzz.ratio(normalize_answer(user_input), normalize_answer(answer), score_cutoff=self.threshold)
+        return score >= self.threshold
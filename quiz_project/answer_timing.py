@@ -0,0 +1,45 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+
+# Stages of answering one prompt; each is stored as a <stage>_ns column of answer_timings
+STAGES = ("display", "synthesis", "playback", "input_wait", "recognition", "matching")
+
+
+class AnswerTimer:
+    """Adds up perf_counter_ns durations of the stages of answering one prompt.
+
+    Stages that run several times (e.g. one input per accepted answer) accumulate;
+    stages that never ran (e.g. synthesis in typed mode) stay absent.
+    """
+
+    def __init__(self):
+        self.durations_ns = {}
+        self.started_ns = self._last_ns = time.perf_counter_ns()
+
+    def add(self, stage, duration_ns):
+        self.durations_ns[stage] = self.durations_ns.get(stage, 0) + duration_ns
+
+    def lap(self, stage):
+        """Adds the time since the previous lap (or since the timer was created) to stage."""
+        now = time.perf_counter_ns()
+        self.add(stage, now - self._last_ns)
+        self._last_ns = now
+
+    @contextmanager
+    def stage(self, stage):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            self.add(stage, end - start)
+            self._last_ns = end
+
+    def total_ns(self):
+        return time.perf_counter_ns() - self.started_ns
+
+
+def timed(timer, stage):
+    """Times a block as stage of timer, or does nothing when timer is None."""
+    return nullcontext() if timer is None else timer.stage(stage)
@@ -0,0 +1,117 @@
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtWidgets import QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget
+
+
+class AnswerView(QWidget):
+    """Test mode view: question, prompt, optional image, answer field and submit button.
+
+    The widgets are created and connected once; show_part() only updates their contents,
+    so moving to the next answer allocates nothing and never re-connects a signal.
+    submitted is emitted when the answer is submitted with Enter or the button. Images
+    come from a ThumbnailLoader; call image_ready() when one has been loaded.
+    """
+    submitted = pyqtSignal()
+
+    def __init__(self, question_font, thumbnails=None, parent=None):
+        super().__init__(parent)
+        self.thumbnails = thumbnails
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        # Inline feedback banner, replacing a message box per answer
+        self.feedback_label = QLabel()
+        self.feedback_label.setWordWrap(True)
+        self.feedback_label.hide()
+        layout.addWidget(self.feedback_label)
+
+        self.question_label = QLabel()
+        self.question_label.setFont(question_font)
+        self.question_label.setWordWrap(True)
+        layout.addWidget(self.question_label)
+
+        self.prompt_label = QLabel()
+        self.prompt_label.setFont(question_font)
+        self.prompt_label.setWordWrap(True)
+        layout.addWidget(self.prompt_label)
+
+        self.image_label = QLabel()
+        layout.addWidget(self.image_label)
+        self.image_path = None  # Image currently shown, kept while the parts of a question are asked
+
+        self.answer_input = QLineEdit()
+        layout.addWidget(self.answer_input)
+
+        submit_button = QPushButton("Submit Answer")
+        submit_button.setStyleSheet("background-color: #4CAF50; color: white; padding: 10px;")
+        layout.addWidget(submit_button)
+        layout.addStretch()
+
+        # Connect Enter key and button to submit answer
+        submit_button.clicked.connect(self.submitted)
+        self.answer_input.returnPressed.connect(self.submitted)
+
+    def show_part(self, question_text, prompt, answers_remaining, image_path=None):
+        """Shows the next prompt to answer and clears the answer field."""
+        self.question_label.setText(question_text)
+        self.question_label.setVisible(bool(question_text))
+        self.prompt_label.setText(f"{prompt} ({answers_remaining} answers remaining)")
+        self.show_image(image_path)
+        self.answer_input.setPlaceholderText(f"Answer for {prompt}")
+        self.clear_answer()
+
+    def show_prompt(self, text, placeholder=""):
+        """Replaces the prompt, e.g. for a practice attempt, and clears the answer field."""
+        self.prompt_label.setText(text)
+        self.answer_input.setPlaceholderText(placeholder)
+        self.clear_answer()
+
+    def show_feedback(self, text, correct):
+        """Shows the result of the last answer; it stays visible while the next prompt is answered."""
+        color = "#5cb85c" if correct else "#d9534f"
+        self.feedback_label.setStyleSheet(f"background-color: {color}; color: white; font-size: 16px; padding: 8px;")
+        self.feedback_label.setText(text)
+        self.feedback_label.show()
+
+    def clear_feedback(self):
+        self.feedback_label.clear()
+        self.feedback_label.hide()
+
+    def show_image(self, image_path):
+        """Shows the thumbnail of an image, or a placeholder until it has been loaded."""
+        if image_path == self.image_path:
+            return
+        self.image_path = image_path
+        if image_path is None or self.thumbnails is None:
+            self.image_label.clear()
+            self.image_label.hide()
+            return
+        loaded, image = self.thumbnails.get(image_path)
+        if loaded:
+            self.set_image(image)
+        else:
+            self.image_label.setText("Loading image...")
+            self.image_label.show()
+
+    def set_image(self, image):
+        if image is None or image.isNull():
+            # Missing or unreadable image
+            self.image_label.clear()
+            self.image_label.hide()
+            return
+        self.image_label.setPixmap(QPixmap.fromImage(image))
+        self.image_label.show()
+
+    def image_ready(self, image_path):
+        """Shows a thumbnail that finished loading if it belongs to the current question."""
+        if image_path == self.image_path:
+            loaded, image = self.thumbnails.get(image_path)
+            if loaded:
+                self.set_image(image)
+
+    def answer(self):
+        return self.answer_input.text()
+
+    def clear_answer(self):
+        self.answer_input.clear()
+        self.answer_input.setFocus()
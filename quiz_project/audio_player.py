@@ -0,0 +1,145 @@
+import io
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# pygame is imported on first use, in the middle of a quiz, so keep it from printing its banner
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+
+class AudioPlayer:
+    """Plays clips from memory through a pygame mixer that is initialized only once.
+
+    Clips are decoded into pygame Sounds on first use and kept in a small LRU, so a
+    repeated prompt or the listening beep plays without touching the disk or restarting
+    the mixer. Playback runs on a dedicated worker thread: play() queues a clip and returns
+    a Future that resolves to True once the clip finished or False if it was cut off by
+    barge_in(). Call .result() to wait; done callbacks run on the worker thread, so Qt code
+    must hand them over to the GUI thread (e.g. with a queued signal). pygame itself is
+    only imported when the first clip is loaded.
+    """
+
+    def __init__(self, max_sounds=64):
+        self.max_sounds = max_sounds
+        self._sounds = OrderedDict()  # clip path -> decoded pygame Sound
+        self._lock = threading.Lock()  # Guards the LRU and the queue; never held while decoding
+        self._mixer_lock = threading.Lock()  # Prefetch threads may load their first clips at the same time
+        self._queue = queue.Queue()  # (sound loader, Future) pairs waiting to be played
+        self._interrupt = threading.Event()
+        self._generation = 0  # Bumped by every barge_in(); older queued clips are dropped
+        self._worker = None
+        self._mixer = None  # pygame.mixer once it was initialized
+
+    def init_mixer(self):
+        """Initializes the mixer on first use; returns False if no audio device is available."""
+        if self._mixer is not None:
+            return True
+        with self._mixer_lock:
+            if self._mixer is not None:
+                return True
+            import pygame
+            try:
+                pygame.mixer.init()
+                self._mixer = pygame.mixer
+                return True
+            except pygame.error as e:
+                print(f"Error initializing mixer: {e}")
+                return False
+
+    def load(self, path):
+        """Returns the decoded Sound for a clip file, reading it only the first time.
+
+        Decoding happens outside the lock, so a prefetch thread preloading a clip never
+        blocks play() on the calling thread.
+        """
+        with self._lock:
+            sound = self._sounds.get(path)
+            if sound is not None:
+                self._sounds.move_to_end(path)
+                return sound
+        if not self.init_mixer():
+            return None
+        with open(path, 'rb') as f:
+            sound = self._mixer.Sound(file=io.BytesIO(f.read()))
+        with self._lock:
+            # Another thread may have decoded the same clip meanwhile; keep the cached one
+            sound = self._sounds.setdefault(path, sound)
+            self._sounds.move_to_end(path)
+            if len(self._sounds) > self.max_sounds:
+                self._sounds.popitem(last=False)
+            return sound
+
+    def preload(self, path):
+        """Decodes a clip ahead of time, e.g. right after it was synthesized."""
+        import pygame
+        try:
+            self.load(path)
+        except (OSError, pygame.error) as e:
+            print(f"Error preloading audio {path}: {e}")
+
+    def play(self, path):
+        """Queues a clip file for playback; returns a Future of its completion."""
+        return self._submit(lambda: self.load(path))
+
+    def _submit(self, load_sound):
+        future = Future()
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="audio-player", daemon=True)
+                self._worker.start()
+            self._queue.put((load_sound, future, self._generation))
+        return future
+
+    def _run(self):
+        while True:
+            load_sound, future, generation = self._queue.get()
+            if load_sound is None:
+                return
+            with self._lock:
+                if generation != self._generation:
+                    future.cancel()  # Queued before a barge-in
+                    continue
+                self._interrupt.clear()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._play_sound(load_sound()))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _play_sound(self, sound):
+        """Plays one sound to its end; returns False if barge_in() cut it off."""
+        if sound is None:
+            return False
+        channel = sound.play()
+        if channel is None:
+            return False
+        # Sleep for the clip length instead of polling, waking up at once on barge-in
+        interrupted = self._interrupt.wait(sound.get_length())
+        while not interrupted and channel.get_busy():
+            interrupted = self._interrupt.wait(0.01)
+        if interrupted:
+            channel.stop()
+        return not interrupted
+
+    def barge_in(self):
+        """Drops queued clips and stops the one that is playing, e.g. when the user starts answering."""
+        with self._lock:
+            self._generation += 1
+            self._interrupt.set()
+
+    def stop(self):
+        """Stops everything that is currently playing."""
+        self.barge_in()
+        if self._mixer is not None and self._mixer.get_init():
+            self._mixer.stop()
+
+    def close(self):
+        """Stops playback and ends the worker thread."""
+        self.stop()
+        if self._worker is not None:
+            self._queue.put((None, None, None))
+            self._worker.join()
+            self._worker = None
@@ -0,0 +1,97 @@
+"""Measures the per-answer UI update time of the test mode view.
+
+Compares updating the persistent AnswerView in place with the previous approach of
+deleting and rebuilding the labels, answer field and button for every answer. Each
+update includes one pass of the event loop, so deferred deletes and layout are counted.
+
+    python benchmark_answer_view.py [answers]
+"""
+import statistics
+import sys
+import time
+
+from PyQt5.QtCore import QEvent
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QApplication, QLabel, QLineEdit, QPushButton, QScrollArea, QVBoxLayout, QWidget
+
+from answer_view import AnswerView
+
+
+def make_content_area():
+    scroll_area = QScrollArea()
+    scroll_area.setWidgetResizable(True)
+    content_widget = QWidget()
+    scroll_area.setWidget(content_widget)
+    scroll_area.resize(600, 600)
+    scroll_area.show()
+    return scroll_area, QVBoxLayout(content_widget)
+
+
+def rebuild_update(content_layout, question_font, question_text, prompt, answers_remaining, on_submit):
+    """The previous per-answer update: delete every widget and build new ones."""
+    for i in reversed(range(content_layout.count())):
+        widget_to_remove = content_layout.itemAt(i).widget()
+        content_layout.removeWidget(widget_to_remove)
+        widget_to_remove.deleteLater()
+
+    question_label = QLabel(question_text)
+    question_label.setFont(question_font)
+    content_layout.addWidget(question_label)
+    question_part_label = QLabel(f"{prompt} ({answers_remaining} answers remaining)")
+    question_part_label.setFont(question_font)
+    content_layout.addWidget(question_part_label)
+    answer_input = QLineEdit()
+    answer_input.setPlaceholderText(f"Answer for {prompt}")
+    content_layout.addWidget(answer_input)
+    answer_input.setFocus()
+    submit_button = QPushButton("Submit Answer")
+    submit_button.setStyleSheet("background-color: #4CAF50; color: white; padding: 10px;")
+    submit_button.clicked.connect(on_submit)
+    content_layout.addWidget(submit_button)
+    answer_input.returnPressed.connect(on_submit)
+
+
+def measure(app, update, answers):
+    """Returns the duration of every update in microseconds."""
+    durations = []
+    for index in range(answers):
+        start = time.perf_counter_ns()
+        update(index)
+        app.processEvents()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)  # As the running event loop would
+        durations.append((time.perf_counter_ns() - start) / 1000)
+    return durations
+
+
+def report(name, durations):
+    durations = sorted(durations)
+    p95 = durations[int(len(durations) * 0.95) - 1]
+    print(f"{name:<10} mean {statistics.mean(durations):9.1f} us   median {statistics.median(durations):9.1f} us"
+          f"   p95 {p95:9.1f} us")
+
+
+def main():
+    answers = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    app = QApplication(sys.argv[:1])
+    question_font = QFont("Arial", 18, QFont.Bold)
+
+    def on_submit():
+        pass
+
+    rebuild_area, rebuild_layout = make_content_area()
+    rebuild = measure(app, lambda i: rebuild_update(rebuild_layout, question_font, f"Question {i}", f"Prompt {i}",
+                                                    1 + i % 3, on_submit), answers)
+
+    reuse_area, reuse_layout = make_content_area()
+    answer_view = AnswerView(question_font)
+    answer_view.submitted.connect(on_submit)
+    reuse_layout.addWidget(answer_view)
+    reuse = measure(app, lambda i: answer_view.show_part(f"Question {i}", f"Prompt {i}", 1 + i % 3), answers)
+
+    print(f"Per-answer UI update over {answers} answers:")
+    report("rebuild", rebuild)
+    report("in place", reuse)
+
+
+if __name__ == "__main__":
+    main()
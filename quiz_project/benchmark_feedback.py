@@ -0,0 +1,104 @@
+"""Drives a whole test-mode quiz through the keyboard and reports the answer throughput.
+
+Runs the Qt quiz on a generated topic twice, once with inline feedback and once with
+the message box / input dialog feedback, typing every answer with QTest (every fifth
+one wrong, to go through the practice flow). Dialogs are dismissed with Enter as soon
+as they open, so the difference is the cost of the dialog round-trips alone; a person
+needs a few hundred milliseconds more to read and dismiss each of them.
+
+    python benchmark_feedback.py [questions]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtTest import QTest
+from PyQt5.QtWidgets import QApplication
+
+import quiz_master
+
+WRONG_EVERY = 5
+
+
+def write_quiz(directory, questions, feedback):
+    """Writes a lesson with one topic and a config using the given feedback mode."""
+    learning_section = os.path.join(directory, "learning_section")
+    os.makedirs(learning_section, exist_ok=True)
+    topic = [{"question": f"Question {i}", f"Prompt {i}": f"answer {i}"} for i in range(questions)]
+    with open(os.path.join(learning_section, "benchmark.json"), 'w', encoding='utf-8') as f:
+        json.dump({"topic": topic}, f)
+    config = {
+        "learning_section_directory": learning_section,
+        "image_directory": os.path.join(directory, "images"),
+        "results_directory": os.path.join(directory, "results"),
+        "thumbnail_cache_directory": os.path.join(directory, "thumbnails"),
+        "practice_attempts": 1,
+        "fuzzy_search_threshold": 80,
+        "spaced_repetition": False,
+        "feedback": feedback,
+    }
+    with open(os.path.join(directory, "config.json"), 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+
+def dismiss_dialogs(app):
+    """Presses Enter on every modal dialog as soon as it is shown."""
+    timer = QTimer()
+    timer.setInterval(1)
+    timer.timeout.connect(lambda: app.activeModalWidget() and QTest.keyClick(app.activeModalWidget(), Qt.Key_Return))
+    timer.start()
+    return timer
+
+
+def type_answer(window, text):
+    QTest.keyClicks(window.answer_view.answer_input, text)
+    QTest.keyClick(window.answer_view.answer_input, Qt.Key_Return)
+
+
+def run_quiz(app, feedback, questions):
+    """Answers a whole quiz; returns (answers typed, seconds)."""
+    with tempfile.TemporaryDirectory() as directory:
+        write_quiz(directory, questions, feedback)
+        os.chdir(directory)
+        window = quiz_master.QuizMaster()
+        window.show()
+        window.subject_dropdown.setCurrentText("benchmark")
+        window.topic_dropdown.setCurrentText("topic")
+        dialog_timer = dismiss_dialogs(app)
+
+        answers = 0
+        start = time.perf_counter()
+        window.on_test_clicked()
+        while window.current_question_index < len(window.questions):
+            if window.advance_timer.isActive():
+                QTest.keyClick(window.answer_view.answer_input, Qt.Key_Return)  # Skip the feedback delay
+            elif window.practice_attempts_left:
+                type_answer(window, window.practice_answer)
+            else:
+                answers += 1
+                type_answer(window, "wrong" if answers % WRONG_EVERY == 0 else window.current_answer_list[0])
+            app.processEvents()
+        seconds = time.perf_counter() - start
+
+        dialog_timer.stop()
+        window.thumbnails.close()
+        window.results_store.close()
+        window.close()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        return answers, seconds
+
+
+def main():
+    questions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    app = QApplication(sys.argv[:1])
+    print(f"Keyboard-driven quiz of {questions} questions, every {WRONG_EVERY}th answer wrong:")
+    for feedback in ("inline", "dialog"):
+        answers, seconds = run_quiz(app, feedback, questions)
+        print(f"{feedback:<7} {answers / seconds * 60:10.0f} answers/min   {seconds / answers * 1000:7.2f} ms per answer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Measures how fast the command-line quizzes start.
+
+For each CLI this reports the import time of the module (from python -X importtime) with
+its slowest imports, and the time from starting the interpreter until the first question
+of a typed test waits for an answer. The menus are answered by a scripted input() that
+picks the first entry of every list, on a generated lesson in a temporary directory. The
+import cost of the speech, audio and image libraries, which are only loaded once a speak
+mode quiz or an image needs them, is listed for comparison.
+
+    python benchmark_startup.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS = ("final_quiz_no_changes.py", "test_by_speaking.py")
+DEFERRED_LIBRARIES = ("speech_recognition", "pygame", "PIL.Image", "tabulate")
+TARGET_MS = 200
+FIRST_PROMPT = "<first prompt>"
+
+# Runs a CLI with an input() that picks the first menu entry and exits at the first answer prompt
+CHILD = f"""
+import builtins, os, runpy, sys
+
+def scripted_input(prompt=""):
+    if prompt.endswith("(Enter number): "):
+        return "1"
+    print({FIRST_PROMPT!r}, flush=True)
+    os._exit(0)
+
+builtins.input = scripted_input
+script, config_file = sys.argv[1:]
+sys.argv = [script, config_file]
+sys.path.insert(0, os.path.dirname(script))
+runpy.run_path(script, run_name="__main__")
+"""
+
+
+def write_quiz(directory, questions=50):
+    """Writes a config and a lesson with one topic; returns the config path."""
+    learning_section = os.path.join(directory, "learning_section")
+    os.makedirs(os.path.join(learning_section, "benchmark"), exist_ok=True)
+    topic = [{"question": f"Question {i}", f"Prompt {i}": f"answer {i}"} for i in range(questions)]
+    with open(os.path.join(learning_section, "benchmark", "lesson.json"), 'w', encoding='utf-8') as f:
+        json.dump({"topic": topic}, f)
+    config = {
+        "learning_section_directory": learning_section,
+        "image_directory": os.path.join(directory, "images"),
+        "results_directory": os.path.join(directory, "results"),
+        "thumbnail_cache_directory": os.path.join(directory, "thumbnails"),
+        "tts_cache_directory": os.path.join(directory, "tts_cache"),
+        "practice_attempts": 1,
+        "fuzzy_search_threshold": 80,
+    }
+    config_file = os.path.join(directory, "config.json")
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    return config_file
+
+
+def import_times(module):
+    """Returns (cumulative microseconds of importing module, {direct import: cumulative microseconds}).
+
+    The total is None if the module can't be imported.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+    direct_imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            # Nested imports are listed before the module that imports them
+            if name.strip() == module:
+                return int(cumulative), direct_imports
+            direct_imports = {}
+        elif depth == 1:
+            direct_imports[name.strip()] = int(cumulative)
+    return None, {}
+
+
+def time_to_first_prompt(script, config_file, directory):
+    """Returns the milliseconds from starting the interpreter to the first answer prompt."""
+    start = time.perf_counter()
+    child = subprocess.Popen([sys.executable, "-u", "-c", CHILD, script, config_file], cwd=directory,
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    for line in child.stdout:
+        if line.strip() == FIRST_PROMPT:
+            elapsed = (time.perf_counter() - start) * 1000
+            child.wait()
+            return elapsed
+    child.wait()
+    raise RuntimeError(f"{script} exited before asking a question")
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    for script in SCRIPTS:
+        module = os.path.splitext(script)[0]
+        total, direct_imports = import_times(module)
+        slowest = sorted(direct_imports.items(), key=lambda item: item[1], reverse=True)[:5]
+        print(f"{script}: import {total / 1000:.1f} ms, slowest imports: "
+              + ", ".join(f"{name} {us / 1000:.1f} ms" for name, us in slowest))
+
+    print("Loaded on first use:")
+    for library in DEFERRED_LIBRARIES:
+        total, _ = import_times(library)
+        print(f"  {library:<20} " + (f"{total / 1000:7.1f} ms" if total is not None else "not installed"))
+
+    print(f"Time to first prompt of a typed test, median of {runs} runs (target {TARGET_MS} ms):")
+    with tempfile.TemporaryDirectory() as directory:
+        config_file = write_quiz(directory)
+        for script in SCRIPTS:
+            path = os.path.join(here, script)
+            time_to_first_prompt(path, config_file, directory)  # Builds the question bank index
+            durations = [time_to_first_prompt(path, config_file, directory) for _ in range(runs)]
+            median = statistics.median(durations)
+            print(f"  {script:<26} {median:7.1f} ms   min {min(durations):7.1f} ms   "
+                  + ("ok" if median < TARGET_MS else "over target"))
+
+
+if __name__ == "__main__":
+    main()
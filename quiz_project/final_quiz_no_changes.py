@@ -1,100 +1,92 @@
 import json
 import os
+import threading
 import time
 import random
+import sys
 from datetime import datetime
-from rapidfuzz import fuzz
-from PIL import Image
-from tabulate import tabulate
-import speech_recognition as sr
-import pyttsx3
-from gtts import gTTS
-import pygame
-
-
-# Initialize pygame mixer for sound playback with error handling
-def init_mixer():
+from answer_matcher import AnswerMatcher
+from question_bank import open_question_bank
+from learning_data_sync import load_manifest, save_manifest, sync_learning_data
+from results_store import open_results_store
+from scheduler import open_review_scheduler
+from thumbnail_cache import ThumbnailLoader, open_thumbnail_cache
+from tts_cache import open_audio_cache
+from answer_timing import AnswerTimer, timed
+from tts_engines import create_tts_engine
+from tts_prefetch import SpeechPrefetcher
+from audio_player import AudioPlayer
+
+
+# Speech output: clips are synthesized by the configured TTS engine, cached on disk, decoded
+# into memory ahead of time and played through a mixer that is only initialized once
+audio_player = AudioPlayer()
+speech_prefetcher = None
+# Speech input, set up together with the prefetcher on the first speak mode quiz
+microphone = None
+speech_recognizer = None
+endpoint_matcher = None
+
+
+def setup_speech(config):
+    """Creates the TTS engine, prefetcher, microphone session and speech recognizer selected by the config.
+
+    Called on the first speak mode quiz, so typed and learn modes never load the speech libraries.
+    """
+    global speech_prefetcher, microphone, speech_recognizer, endpoint_matcher
+    if speech_prefetcher is not None:
+        return
+    from speech_input import MicrophoneSource, create_recognizer
+    # One microphone session for the whole quiz: calibrated once, then kept open between answers
+    microphone = MicrophoneSource(calibration_seconds=0.5)
+    engine = create_tts_engine(config.get('tts_engine', 'gtts'))
+    speech_prefetcher = SpeechPrefetcher(open_audio_cache(config, engine.extension), engine,
+                                         on_ready=audio_player.preload)
+    speech_recognizer = create_recognizer(config, microphone.recognizer, language="en")
+    # Stricter than answer checking: only a confident interim match ends the recording early
+    endpoint_matcher = AnswerMatcher(config.get('early_endpoint_score', 90))
+
+
+def speak_text(text, language='en', wait=True, timer=None):
+    """Speaks text, waiting for synthesis only if the clip was not prefetched.
+
+    With wait=False playback continues in the background until it ends or audio_player.barge_in() is called.
+    An optional AnswerTimer gets the time spent on synthesis and playback.
+    """
     try:
-        pygame.mixer.init()
-    except pygame.error as e:
-        print(f"Error initializing mixer: {e}")
-
-
-def play_sound(sound_file):
-    """Plays a sound to notify the user that the system is ready to listen."""
-    if not pygame.mixer.get_init():  # Check if the mixer is initialized
-        init_mixer()
-
-    pygame.mixer.music.load(sound_file)
-    pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():
-        pygame.time.Clock().tick(5)  # Ensures the sound completes before moving on
-def play_audio_with_pygame(file_path):
-    """Plays the audio file using pygame to avoid opening external applications."""
-    pygame.mixer.init()
-    pygame.mixer.music.load(file_path)
-    pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():
-        pygame.time.Clock().tick(5)  # Keeps sound playing until finished
-
-    # Ensure pygame finishes using the file before deletion
-    pygame.mixer.music.stop()
-    pygame.mixer.quit()
-
-    # Remove the mp3 file after playing to prevent permission issues
-    if os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-        except Exception as e:
-            print(f"Error deleting file {file_path}: {e}")
-
-
-# Speak text using gTTS and play it using pygame
-# Speak text using gTTS and play it using pygame
-def speak_text_gtts(text, language='en'):
-    """Converts text to speech using gTTS and plays it using pygame."""
-    try:
-        # Use a unique filename for each audio file to avoid conflicts
-        filename = f"speech_{int(time.time())}.mp3"
-        tts = gTTS(text=text, lang=language)
-        tts.save(filename)
-        play_audio_with_pygame(filename)
+        with timed(timer, "synthesis"):
+            clip = speech_prefetcher.clip(text, language)
+        playback = audio_player.play(clip)
+        if wait:
+            with timed(timer, "playback"):
+                playback.result()
     except Exception as e:
-        print(f"Error with gTTS: {e}")
+        print(f"Error with text-to-speech: {e}")
 
-# Speak text in Hindi
-def speak_text(text):
-    try:
-        speak_text_gtts(text, language='en')  # Set language to 'hi' for Hindi
-    except Exception as e:
-        print(f"Error with gTTS: {e}")
 
 # Function to handle speech recognition
-def listen_to_user():
-    recognizer = sr.Recognizer()
-    mic = sr.Microphone()
+def listen_to_user(phrases=None, timer=None):
+    import speech_recognition as sr
+    from speech_input import listen_for_answer
 
-    with mic as source:
-        # Minimize the time for ambient noise adjustment to speed up listening
-        recognizer.adjust_for_ambient_noise(source, duration=0.5)  # Reduced duration for faster adjustment
+    # Play sound to alert the user to start speaking
+    with timed(timer, "playback"):
+        audio_player.play("beep.mp3").result()  # Ensure you have a beep.mp3 sound file in your project directory
 
-        # Play sound to alert the user to start speaking
-        play_sound("beep.mp3")  # Ensure you have a beep.mp3 sound file in your project directory
+    print("-------")
 
-        print("-------")
-
-        try:
-            # Listen with a phrase time limit to stop after you've finished talking
-            audio = recognizer.listen(source, timeout=5, phrase_time_limit=4)  # Timeout after 5 seconds of silence
-        except sr.WaitTimeoutError:
+    try:
+        # Stop after a pause, the phrase time limit or a confident match; give up after 5 seconds of silence
+        user_input = listen_for_answer(microphone, speech_recognizer, threading.Event(), phrases, endpoint_matcher,
+                                       timeout=5, phrase_time_limit=4, keep_pre_roll=False, timer=timer)
+        if user_input is None:
             print("Timeout: No speech detected.")
             return ""  # Return an empty string if no input was detected
-
-    try:
-        # Convert speech to text using Google's Speech API
-        user_input = recognizer.recognize_google(audio, language="en")
         print(f"You said: {user_input}")
         return user_input.lower()
+    except OSError as e:
+        print(f"Could not open the microphone: {e}")
+        return ""
     except sr.UnknownValueError:
         print("Sorry, I could not understand what you said.")
         return ""  # Return empty string if speech is unintelligible
@@ -109,6 +101,11 @@ def listen_to_user():
 class QuizMaster:
     def __init__(self, config_file):
         self.load_config(config_file)
+        self.question_bank = open_question_bank(self.config)
+        self.results_store = open_results_store(self.config, self.question_bank)
+        self.review_scheduler = open_review_scheduler(self.config, self.results_store)
+        # Images are shown downscaled from an on-disk cache and prepared ahead of their question
+        self.image_loader = ThumbnailLoader(open_thumbnail_cache(self.config, self.config.get('cli_image_size', 800)))
         self.data = {}
         self.results = []
 
@@ -123,6 +120,10 @@ class QuizMaster:
         self.practice_attempts = self.config['practice_attempts']
         self.results_directory = self.config['results_directory']
         self.fuzzy_search_threshold = self.config.get('fuzzy_search_threshold', 80)  # Default to 80 if not set
+        self.answer_matcher = AnswerMatcher(self.fuzzy_search_threshold)
+        self.speech_prefetch_questions = self.config.get('speech_prefetch_questions', 3)
+        self.weak_question_limit = self.config.get('weak_question_limit', 10)
+        self.image_prefetch_questions = self.config.get('image_prefetch_questions', 3)
 
         # Ensure the directories exist
         os.makedirs(self.results_directory, exist_ok=True)
@@ -133,25 +134,13 @@ class QuizMaster:
         category = category.strip()
         topic = topic.strip()
 
-        # Path to the result file
-        result_file_name = os.path.join(self.results_directory, category, lesson, topic, "result.json")
+        # Indexed query, already sorted by time_taken_minutes
+        all_results_sorted = self.results_store.sessions(category, lesson, topic, order_by="time_taken_minutes")
 
-        # Check if the result file exists
-        if not os.path.exists(result_file_name):
+        if not all_results_sorted:
             print(f"No results found for {category}/{lesson}/{topic}")
             return
 
-        # Load the results from the file
-        try:
-            with open(result_file_name, 'r', encoding='utf-8') as result_file:
-                all_results = json.load(result_file)
-        except json.JSONDecodeError:
-            print(f"Error reading the result file {result_file_name}")
-            return
-
-        # Sort results by time_taken_minutes
-        all_results_sorted = sorted(all_results, key=lambda x: x['time_taken_minutes'])
-
         # ANSI color codes
         RED = '\033[91m'
         RESET = '\033[0m'
@@ -180,6 +169,7 @@ class QuizMaster:
         ]
 
         # Display the results in a tabular format with red headers
+        from tabulate import tabulate
         print(tabulate(table_data, headers, tablefmt="grid"))
 
     def load_learning_data(self):
@@ -204,74 +194,32 @@ class QuizMaster:
         """Initialize the learning data from all available JSON files."""
         learning_data = {}
 
-        # Loop through all JSON files in categorized folders
-        for category in os.listdir(self.learning_section_directory):
-            category_path = os.path.join(self.learning_section_directory, category)
-            if os.path.isdir(category_path):
-                learning_data[category] = {}
-                for json_file in self.list_json_files_in_category(category_path):
-                    self.load_data(os.path.splitext(os.path.basename(json_file))[0], category_path)
-                    lesson = os.path.splitext(os.path.basename(json_file))[0]
-                    learning_data[category][lesson] = {topic: 0 for topic in self.data.keys()}  # Initialize all topics with 0
-
+        # Start from an empty manifest so that every lesson is read once
+        manifest = {}
+        sync_learning_data(learning_data, self.learning_section_directory, manifest, self.read_lesson_topics)
+        save_manifest(manifest)
         return learning_data
 
+    def read_lesson_topics(self, category, lesson):
+        """Returns the topic names of a lesson from the question bank."""
+        return self.question_bank.topics(f"{category}/{lesson}")
+
     def list_json_files_in_category(self, category_path):
         """List all JSON files in a given category folder."""
         return [os.path.join(category_path, f) for f in os.listdir(category_path) if f.endswith('.json')]
 
     def update_learning_data(self, category, lesson, topic):
         """Update the learning count for a given topic in a given category and lesson."""
-        # Load existing learning data
-        learning_data = self.load_learning_data()
-
-        # # Strip any leading/trailing spaces from category, lesson, and topic
-        # category = category.strip()
-        # lesson = lesson.strip()
-        # topic = topic.strip()
-        #
-        # # Ensure category exists in learning data
-        # if category not in learning_data:
-        #     learning_data[category] = {}
-        #
-        # # Ensure lesson exists in the category
-        # if lesson not in learning_data[category]:
-        #     learning_data[category][lesson] = {}
-        #
-        # # Ensure topic exists and increment the count
-        # if topic not in learning_data[category][lesson]:
-        #     learning_data[category][lesson][topic] = 0
-        learning_data[category][lesson][topic] += 1
-
-        # Save the updated learning data
-        self.save_learning_data(learning_data)
+        # Counts live in the results store; learning_data.json only tracks the available topics
+        self.results_store.increment_learning_count(category.strip(), lesson.strip(), topic.strip())
 
     def update_learning_data_with_new_topics(self, learning_data):
-        """Update the learning data to add new topics from JSON files, without modifying existing data."""
-        for category in os.listdir(self.learning_section_directory):
-            category = category.strip()
-            category_path = os.path.join(self.learning_section_directory, category)
-            if os.path.isdir(category_path):
-                # Add category if it doesn't exist
-                if category not in learning_data:
-                    learning_data[category] = {}
-
-                for json_file in self.list_json_files_in_category(category_path):
-                    self.load_data(os.path.splitext(os.path.basename(json_file))[0], category_path)
-                    lesson = os.path.splitext(os.path.basename(json_file))[0].strip()
-
-                    # Add lesson if it doesn't exist
-                    if lesson not in learning_data[category]:
-                        learning_data[category][lesson.strip()] = {}
-
-                    for topic in self.data.keys():
-                        topic = topic.strip()
-                        # Add topic if it doesn't exist
-                        if topic not in learning_data[category][lesson]:
-                            learning_data[category][lesson][topic] = 0
-
-        # Save the updated learning data
-        self.save_learning_data(learning_data)
+        """Update the learning data to add topics of new or modified JSON files, without modifying existing data."""
+        manifest = load_manifest()
+        if sync_learning_data(learning_data, self.learning_section_directory, manifest, self.read_lesson_topics):
+            # Save the updated learning data
+            self.save_learning_data(learning_data)
+            save_manifest(manifest)
 
     def save_learning_data(self, learning_data):
         """Save the learning data to file."""
@@ -283,17 +231,16 @@ class QuizMaster:
             print(f"Error saving learning data: {e}")
 
     def load_data(self, lesson, category_path):
-        """Loads the selected JSON file's content from its category."""
-        data_file_path = os.path.join(category_path, lesson + '.json')
-
-        # Open the file using UTF-8 encoding to handle special characters
-        with open(data_file_path, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+        """Loads the selected lesson's topics from the compiled question bank."""
+        # Lessons are keyed by their path relative to the learning section, e.g. "maths/addition"
+        relative_path = os.path.relpath(os.path.join(category_path, lesson), self.learning_section_directory)
+        self.data = self.question_bank.lesson(relative_path.replace('\\', '/'))
         self.data_file = lesson  # Store the relative path (e.g., "Science/Physics")
 
     def display_learning_data(self):
         """Display the hierarchical learning data in a tree format with color."""
         learning_data = self.load_learning_data()
+        learning_counts = self.results_store.learning_counts()
 
         # ANSI color codes
         colors = {
@@ -307,7 +254,8 @@ class QuizMaster:
             print(f"{colors['category']}{category}/{colors['reset']}")
             for lesson, topics in lessons.items():
                 print(f"{colors['lesson']}├── Lesson: {lesson}{colors['reset']}")
-                for topic, count in topics.items():
+                for topic in topics:
+                    count = learning_counts.get(category, {}).get(lesson, {}).get(topic, 0)
                     print(f"{colors['topic']}│   ├── Topic: {topic} ({count} tests taken){colors['reset']}")
             print("")
 
@@ -322,8 +270,8 @@ class QuizMaster:
                     json_files.append(json_file)
         return sorted(json_files)
 
-    def show_image(self, image_name, category, lesson, topic):
-        """Displays the image associated with the question, dynamically building the path."""
+    def image_path(self, image_name, category, lesson, topic):
+        """Builds the absolute path of a question image."""
         # Remove .json extension from lesson name if present
         lesson = lesson.replace(".json", "")  # Ensure no .json extension is used
 
@@ -332,13 +280,24 @@ class QuizMaster:
         image_path = os.path.join(self.image_directory, category, lesson, topic, image_name)
 
         # Convert to absolute path for better file resolution
-        image_path = os.path.abspath(image_path)
+        return os.path.abspath(image_path)
+
+    def show_image(self, image_name, category, lesson, topic):
+        """Displays the image associated with the question, dynamically building the path."""
+        image_path = self.image_path(image_name, category, lesson, topic)
 
         # Debugging: Print the full image path
         print(f"Looking for image at: {image_path}")
 
         if os.path.exists(image_path):
-            img = Image.open(image_path)
+            # Usually prefetched already; only a thumbnail that is not cached yet is scaled here
+            thumbnail_path = self.image_loader.load(image_path)
+            if thumbnail_path is None:
+                # The loader already printed why, e.g. a corrupt file
+                print(f"Image {image_name} could not be loaded from {image_path}.")
+                return
+            from PIL import Image
+            img = Image.open(thumbnail_path)
             img.show()
             print(f"Image {image_name} displayed successfully.")
         else:
@@ -350,30 +309,33 @@ class QuizMaster:
         reset_code = "\033[0m"
         print(f"{red_code}{text}{reset_code}")
 
-    def handle_question(self, question_data, category, lesson, topic):
+    def handle_question(self, question, category, lesson, topic):
         """Handles the process of asking a question and checking the answer."""
         correct = True
         image_shown = False
 
         # Check if the question contains an image to show at the start
-        if "type" in question_data and question_data["type"] == "image" and "image" in question_data:
-            self.show_image(question_data["image"], category, lesson, topic)
+        if question.shows_image_first:
+            self.show_image(question.image, category, lesson, topic)
             image_shown = True  # Mark that the image has been shown
 
-        # Iterate over all key-value pairs in question_data
-        for key, value in question_data.items():
-            # Skip "type" and "image" keys when displaying the question (these are metadata)
-            if key == "type" or key == "image":
-                continue
+        # Answers of each part were split and normalized once when the lesson was compiled
+        for part in question.parts:
+            key = part.prompt
 
             # Display the question
+            timer = AnswerTimer()
             self.print_red(f"\nQuestion: {key}")
+            timer.lap("display")
 
             # Handle the answer
-            correct = self.handle_single_answer_question(key, value)
+            answer_start = time.perf_counter()
+            correct = self.handle_single_answer_question(part, timer)
+            self.record_answer(category, lesson, topic, key, correct, time.perf_counter() - answer_start)
+            self.record_timings(category, lesson, topic, key, "test", timer)
 
             if not correct:
-                correct_answer = value.split('@')[0]
+                correct_answer = part.correct_answer
                 print(f"\nYour answer was incorrect. The correct answer is: {correct_answer}")
                 print("Let's practice the correct answer.")
                 self.practice_wrong_answer(correct_answer, key)
@@ -384,67 +346,79 @@ class QuizMaster:
                 self.results.append({"question": key, "result": "correct", "correct_answer": ""})
 
         # If there was no image at the start but the question has an image, show it now
-        if not image_shown and "image" in question_data:
-            self.show_image(question_data["image"], category, lesson, topic)
+        if not image_shown and question.image:
+            self.show_image(question.image, category, lesson, topic)
+
+    def record_answer(self, category, lesson, topic, key, correct, response_seconds):
+        """Updates the statistics of one answered question in the results store."""
+        self.results_store.record_answer(category.strip(), lesson.replace(".json", "").strip(), topic.strip(),
+                                         key, correct, response_seconds)
+
+    def record_timings(self, category, lesson, topic, key, mode, timer):
+        """Stores where the time of one answer went in the results store."""
+        self.results_store.record_timings(category.strip(), lesson.replace(".json", "").strip(), topic.strip(),
+                                          key, mode, timer)
 
-    def handle_single_answer_question(self, question, answer):
+    def handle_single_answer_question(self, part, timer=None):
         """Handles single-answer questions."""
-        return self.ask_and_check(question, answer)
+        return self.ask_and_check(part, timer)
 
-    def ask_and_check(self, prompt, answer):
-        parts = answer.split('@')
-        correct_answers = [ans.strip().lower() for ans in parts[0].split(';')]
-        additional_info = parts[1].strip() if len(parts) > 1 else ""
-        remaining_answers = set(correct_answers)
+    def ask_and_check(self, part, timer=None):
+        """Asks for every accepted answer of a question part; returns False on the first miss."""
+        # Remaining answers as parallel display / pre-normalized lists
+        remaining_answers = list(part.answers)
+        remaining_normalized = list(part.normalized)
 
         while remaining_answers:
-            user_input = input(": ").strip().lower()
+            with timed(timer, "input_wait"):
+                user_input = input(": ").strip().lower()
             if user_input == "skip":
                 print("Skipped this question.")
                 return False
 
-            matched_answers = [ans for ans in remaining_answers if fuzz.ratio(user_input, ans) >= self.fuzzy_search_threshold]
-            if matched_answers:
-                for matched in matched_answers:
-                    print(f"Correct! '{matched}' matched.")
-                    remaining_answers.remove(matched)
-            else:
+            with timed(timer, "matching"):
+                matched = self.remove_matched_answers(user_input, remaining_answers, remaining_normalized)
+            if not matched:
                 print("Incorrect. Try again.")
                 return False
 
-        if additional_info:
-            print(f"Information: {additional_info}")
+        if part.info:
+            print(f"Information: {part.info}")
         return True
 
+    def remove_matched_answers(self, user_input, remaining_answers, remaining_normalized):
+        """Removes every remaining answer matched by user_input; returns False if none matched."""
+        matches = self.answer_matcher.all_matches(user_input, remaining_normalized)
+        for index, score in matches:
+            print(f"Correct! '{remaining_answers[index]}' matched.")
+        for index in sorted((index for index, score in matches), reverse=True):
+            del remaining_answers[index]
+            del remaining_normalized[index]
+        return bool(matches)
+
     def practice_wrong_answer(self, correct_answer, prompt):
         for attempt in range(self.practice_attempts):
             user_input = input(f"Practice {attempt + 1}/{self.practice_attempts} - {prompt}: ").strip().lower()
-            if fuzz.ratio(user_input, correct_answer.lower()) >= self.fuzzy_search_threshold:
+            audio_player.barge_in()  # The user answered, stop any feedback that is still playing
+            if self.answer_matcher.is_match(user_input, correct_answer.lower()):
                 print("Correct!")
             else:
                 print(f"Incorrect. The correct answer is: {correct_answer}. Please try again.")
         print("Practice completed.")
 
     def record_result(self, category, lesson, topic, time_taken):
-        """Save the result in a structured directory format and append new results to the same file."""
+        """Save the result of the finished session in the results store."""
         # Remove `.json` from lesson name if it's present and strip any leading/trailing spaces
         lesson = lesson.replace(".json", "").strip()
         category = category.strip()
         topic = topic.strip()
 
-        # Create the directory structure if it doesn't exist
-        result_dir = os.path.join(self.results_directory, category, lesson, topic)
-        os.makedirs(result_dir, exist_ok=True)
-
         # Collect wrong questions and their correct answers
         wrong_questions_with_answers = [
             {"question": r['question'], "correct_answer": r['correct_answer']}
             for r in self.results if r['result'] == 'wrong'
         ]
 
-        # File path for the result JSON file
-        result_file_name = os.path.join(result_dir, "result.json")
-
         # Prepare result data to save
         new_result_data = {
             "date_time": datetime.now().strftime("%H:%M:%S %d-%m-%Y"),
@@ -455,21 +429,11 @@ class QuizMaster:
             # Add the wrong questions and correct answers here
         }
 
-        # Check if the file exists; if it does, load existing data, else create a new list
-        if os.path.exists(result_file_name):
-            with open(result_file_name, 'r', encoding='utf-8') as result_file:
-                all_results = json.load(result_file)
-        else:
-            all_results = []
-
-        # Append the new result to the list
-        all_results.append(new_result_data)
-
-        # Save the updated list of results back to the file
-        with open(result_file_name, 'w', encoding='utf-8') as result_file:
-            json.dump(all_results, result_file, indent=4)
+        self.results_store.record_session(category, lesson, topic, new_result_data)
+        if self.review_scheduler is not None:
+            self.review_scheduler.record_session(category, lesson, topic, self.results)
 
-        print(f"Results recorded in {result_file_name}")
+        print(f"Results recorded for {category}/{lesson}/{topic}")
 
     def run_quiz(self, topic, mode):
         """Runs the quiz or learn mode for the selected topic."""
@@ -478,17 +442,38 @@ class QuizMaster:
             return
 
         # Get the list of questions for the given topic
-        questions = self.data[topic]
+        questions = self.data[topic].questions
 
         self.results = []
 
-        # Shuffle the list of questions directly
-        random.shuffle(questions)
+        if mode == "drill":
+            # Drill the most often missed questions, answered by typing like a test
+            questions = self.select_weak_questions(topic, questions)
+            if not questions:
+                return
+            mode = "test"
+        elif mode == "review":
+            # Only ask the questions that are due for review, plus a few new ones, answered by typing
+            questions = self.select_due_questions(topic, questions)
+            if not questions:
+                return
+            mode = "test"
+        else:
+            # Shuffle the list of questions directly
+            random.shuffle(questions)
 
         start_time = time.time()
 
+        if mode == "speak":
+            setup_speech(self.config)
+
         if mode == "test" or mode == "speak":
-            for q in questions:
+            for index, q in enumerate(questions):
+                # Prepare the images of the next questions while this one is answered
+                self.prefetch_question_images(questions[index:index + 1 + self.image_prefetch_questions], topic)
+                if mode == "speak":
+                    # Synthesize the next questions while this one is being answered
+                    self.prefetch_question_speech(questions[index:index + 1 + self.speech_prefetch_questions])
                 if mode == "test":
                     # For test mode, ask via text input
                     self.handle_question(q, self.current_category, self.current_lesson, topic)
@@ -514,32 +499,78 @@ class QuizMaster:
         elif mode == "learn":
             self.display_learning_mode(questions, topic)
 
-    def handle_question_speak(self, question_data, category, lesson, topic):
+    def select_due_questions(self, topic, questions):
+        """Returns the questions of a topic that are due for review, most overdue first.
+
+        If nothing is due (or spaced repetition is off) the whole topic can be quizzed instead.
+        """
+        if self.review_scheduler is None:
+            print("Spaced repetition is turned off in the config, asking the whole topic.")
+            random.shuffle(questions)
+            return questions
+        category = self.current_category.strip()
+        lesson = self.current_lesson.replace(".json", "").strip()
+        due_questions = self.review_scheduler.session(category, lesson, topic.strip(), questions)
+        if not due_questions:
+            next_due = self.review_scheduler.next_due(category, lesson, topic.strip())
+            next_review = datetime.fromtimestamp(next_due).strftime("%Y-%m-%d %H:%M") if next_due else "never"
+            print(f"Nothing in '{topic}' is due for review. Next review: {next_review}")
+            if input("Quiz the whole topic anyway? (yes/no): ").strip().lower() in ("yes", "y"):
+                random.shuffle(questions)
+                return questions
+        return due_questions
+
+    def select_weak_questions(self, topic, questions):
+        """Returns the questions of a topic with the most often missed prompts, worst first."""
+        weakest = self.results_store.weakest_questions(self.current_category.strip(),
+                                                       self.current_lesson.replace(".json", "").strip(),
+                                                       topic.strip(), self.weak_question_limit)
+        rank = {stats["question"]: index for index, stats in enumerate(weakest)}
+        weak_questions = [question for question in questions if any(part.prompt in rank for part in question.parts)]
+        weak_questions.sort(key=lambda question: min(rank[part.prompt] for part in question.parts
+                                                     if part.prompt in rank))
+        if not weak_questions:
+            print(f"No question in '{topic}' has been missed yet.")
+        return weak_questions
+
+    def prefetch_question_images(self, questions, topic):
+        """Queues thumbnails of the images of the given questions."""
+        self.image_loader.prefetch([self.image_path(question.image, self.current_category, self.current_lesson, topic)
+                                    for question in questions if question.image])
+
+    def prefetch_question_speech(self, questions):
+        """Queues synthesis of the spoken prompts of the given questions."""
+        speech_prefetcher.prefetch([f"Question: {part.prompt}" for question in questions for part in question.parts])
+
+    def handle_question_speak(self, question, category, lesson, topic):
         """Handles the process of asking a question and checking the answer in speak mode."""
         correct = True
         image_shown = False
 
         # Check if the question contains an image to show at the start
-        if "type" in question_data and question_data["type"] == "image" and "image" in question_data:
-            self.show_image(question_data["image"], category, lesson, topic)
+        if question.shows_image_first:
+            self.show_image(question.image, category, lesson, topic)
             image_shown = True  # Mark that the image has been shown
 
-        # Iterate over all key-value pairs in question_data
-        for key, value in question_data.items():
-            # Skip "type" and "image" keys when displaying the question (these are metadata)
-            if key == "type" or key == "image":
-                continue
+        # Answers of each part were split and normalized once when the lesson was compiled
+        for part in question.parts:
+            key = part.prompt
 
             # Display the question
+            timer = AnswerTimer()
             self.print_red(f"\nQuestion: {key}")
-            speak_text(f"Question: {key}")  # Speak the question
+            timer.lap("display")
+            speak_text(f"Question: {key}", timer=timer)  # Speak the question
 
             # Handle the answer by listening to user speech
-            correct = self.handle_single_answer_question_speak(key, value)
+            answer_start = time.perf_counter()
+            correct = self.handle_single_answer_question_speak(part, timer)
+            self.record_answer(category, lesson, topic, key, correct, time.perf_counter() - answer_start)
+            self.record_timings(category, lesson, topic, key, "speak", timer)
 
             if not correct:
-                correct_answer = value.split('@')[0]
-                speak_text(f"Your answer was incorrect. The correct answer is: {correct_answer}")
+                correct_answer = part.correct_answer
+                speak_text(f"Your answer was incorrect. The correct answer is: {correct_answer}", wait=False)
                 print(f"\nYour answer was incorrect. The correct answer is: {correct_answer}")
                 print("Let's practice the correct answer.")
                 self.practice_wrong_answer(correct_answer, key)
@@ -548,41 +579,35 @@ class QuizMaster:
                 self.results.append({"question": key, "result": "correct"})
 
         # If there was no image at the start but the question has an image, show it now
-        if not image_shown and "image" in question_data:
-            self.show_image(question_data["image"], category, lesson, topic)
+        if not image_shown and question.image:
+            self.show_image(question.image, category, lesson, topic)
 
-    def handle_single_answer_question_speak(self, prompt, answer):
+    def handle_single_answer_question_speak(self, part, timer=None):
         """Handles single-answer questions in speak mode."""
-        return self.ask_and_check_speak(prompt, answer)
+        return self.ask_and_check_speak(part, timer)
 
 
 
-    def ask_and_check_speak(self, prompt, answer):
+    def ask_and_check_speak(self, part, timer=None):
         """Asks the question and checks if the answer is correct in speak mode."""
-        parts = answer.split('@')
-        correct_answers = [ans.strip().lower() for ans in parts[0].split(';')]
-        additional_info = parts[1].strip() if len(parts) > 1 else ""
+        remaining_answers = list(part.answers)
+        remaining_normalized = list(part.normalized)
 
-        remaining_answers = set(correct_answers)
         while remaining_answers:
-            user_input = listen_to_user().strip().lower()  # Capture user input via speech
+            user_input = listen_to_user(remaining_normalized, timer).strip().lower()  # Capture user input via speech
 
             if user_input == "skip":
                 print("Skipped this question.")
                 return False
 
-            matched_answers = [ans for ans in remaining_answers if
-                               fuzz.ratio(user_input, ans) >= self.fuzzy_search_threshold]
-            if matched_answers:
-                for matched in matched_answers:
-                    print(f"Correct! '{matched}' matched.")
-                    remaining_answers.remove(matched)
-            else:
+            with timed(timer, "matching"):
+                matched = self.remove_matched_answers(user_input, remaining_answers, remaining_normalized)
+            if not matched:
                 print("Incorrect. Try again.")
                 return False
 
-        if additional_info:
-            print(f"Information: {additional_info}")
+        if part.info:
+            print(f"Information: {part.info}")
         return True
 
 
@@ -601,7 +626,7 @@ def get_selection_from_list(options, prompt):
             except ValueError:
                 print("Invalid input. Please enter a number.")
 def main():
-    config_file = "/Users/macbookpro/Documents/Developer/learn_through_quiz/quiz_project/config.json"
+    config_file = sys.argv[1] if len(sys.argv) > 1 else "/Users/macbookpro/Documents/Developer/learn_through_quiz/quiz_project/config.json"
     quiz_master = QuizMaster(config_file)
 
     while True:
@@ -632,10 +657,10 @@ def main():
         quiz_master.print_red("Available topics:")
         selected_topic = get_selection_from_list(available_topics, "Enter the topic")
 
-        # List available modes (test/speak/learn/show results)
-        modes = ["test", "speak", "learn", "show test results"]
+        # List available modes (test/speak/learn/review/drill/show results)
+        modes = ["test", "speak", "learn", "review", "drill", "show test results"]
         quiz_master.print_red("Select mode:")
-        selected_mode = get_selection_from_list(modes, "Do you want to give a test, speak, learn, or show test results (Enter number)")
+        selected_mode = get_selection_from_list(modes, "Do you want to give a test, speak, learn, review the due questions, drill your weak questions, or show test results (Enter number)")
 
         if selected_mode == "show test results":
             # Show the test results
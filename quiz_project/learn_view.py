@@ -0,0 +1,167 @@
+import os
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QRect, QSize, Qt
+from PyQt5.QtGui import QFontMetrics, QImage, QPalette
+from PyQt5.QtWidgets import QAbstractItemView, QListView, QStyledItemDelegate
+
+
+IMAGE_SIZE = 300  # Images are shown scaled to fit a square of this size
+PADDING = 8
+SPACING = 4
+PREFETCH_ROWS = 5  # Images of the rows below a painted one are loaded ahead of scrolling
+
+QuestionRole = Qt.UserRole + 1
+ImageRole = Qt.UserRole + 2
+
+
+class LearnModel(QAbstractListModel):
+    """The questions of a topic as list rows for the learn view.
+
+    Images are only requested when a row is painted, from a ThumbnailLoader that scales
+    and decodes them in the background; call image_ready() when one has been loaded so
+    the rows showing it are repainted.
+    """
+
+    def __init__(self, questions, image_folder=None, thumbnails=None, parent=None):
+        super().__init__(parent)
+        self.questions = questions
+        self.image_folder = image_folder if thumbnails is not None else None  # None: images are not shown
+        self.thumbnails = thumbnails
+        self._image_exists = {}  # image file name -> whether it exists, checked once per file
+        self._rows_by_image = None  # image path -> rows showing it, built on the first image_ready()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.questions)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        question = self.questions[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{index.row() + 1}. {question.text}"
+        if role == QuestionRole:
+            return question
+        if role == ImageRole:
+            return self.image(index.row())
+        return None
+
+    def shows_image(self, question):
+        return self.image_folder is not None and bool(question.image)
+
+    def image_path(self, question):
+        return os.path.join(self.image_folder, question.image)
+
+    def image_exists(self, question):
+        exists = self._image_exists.get(question.image)
+        if exists is None:
+            exists = self._image_exists[question.image] = os.path.exists(self.image_path(question))
+        return exists
+
+    def image(self, row):
+        """Returns the thumbnail QImage of a row, None while it is being loaded or a null QImage if it failed."""
+        question = self.questions[row]
+        if not self.shows_image(question):
+            return None
+        loaded, image = self.thumbnails.get(self.image_path(question))
+        if loaded:
+            return image if image is not None else QImage()
+        self.thumbnails.prefetch([self.image_path(upcoming) for upcoming in self.questions[row + 1:row + 1 + PREFETCH_ROWS]
+                                  if self.shows_image(upcoming)])
+        return None
+
+    def image_ready(self, image_path):
+        """Repaints the rows that show an image which has just been loaded."""
+        if self.image_folder is None:
+            return
+        if self._rows_by_image is None:
+            self._rows_by_image = {}
+            for row, question in enumerate(self.questions):
+                if self.shows_image(question):
+                    self._rows_by_image.setdefault(self.image_path(question), []).append(row)
+        for row in self._rows_by_image.get(image_path, ()):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [ImageRole])
+
+
+class LearnDelegate(QStyledItemDelegate):
+    """Paints a question row: numbered question text, image, and every prompt with its answers and info.
+
+    Row heights are computed from the text alone (an existing image always takes an
+    IMAGE_SIZE slot), so laying out the list never decodes an image.
+    """
+
+    def __init__(self, question_font, parent=None):
+        super().__init__(parent)
+        self.question_font = question_font
+
+    def _blocks(self, index, font):
+        """Yields (text, font) for each line of a row; text is None for the image slot."""
+        question = index.data(QuestionRole)
+        model = index.model()
+        yield index.data(Qt.DisplayRole), self.question_font
+        if model.shows_image(question):
+            if model.image_exists(question):
+                yield None, None
+            else:
+                yield "Image not found", font
+        for part in question.parts:
+            yield f"{part.prompt}: {part.correct_answer}", font
+            if part.info:
+                yield f"   Info: {part.info}", font
+
+    def _text_width(self, option):
+        view = self.parent()
+        width = view.viewport().width() if view is not None else option.rect.width()
+        return max(width - 2 * PADDING, 1)
+
+    @staticmethod
+    def _text_height(text, font, width):
+        return QFontMetrics(font).boundingRect(QRect(0, 0, width, 1 << 20), Qt.TextWordWrap, text).height()
+
+    def sizeHint(self, option, index):
+        width = self._text_width(option)
+        height = 2 * PADDING
+        for text, font in self._blocks(index, option.font):
+            height += (IMAGE_SIZE if text is None else self._text_height(text, font, width)) + SPACING
+        return QSize(width + 2 * PADDING, height)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setPen(option.palette.color(QPalette.Text))
+        left = option.rect.left() + PADDING
+        width = option.rect.width() - 2 * PADDING
+        y = option.rect.top() + PADDING
+        for text, font in self._blocks(index, option.font):
+            if text is None:
+                image = index.data(ImageRole)
+                if image is None or image.isNull():
+                    painter.setFont(option.font)
+                    painter.drawText(QRect(left, y, width, IMAGE_SIZE), Qt.AlignLeft | Qt.AlignTop,
+                                     "Loading image..." if image is None else "Image could not be loaded")
+                else:
+                    painter.drawImage(left, y, image)
+                y += IMAGE_SIZE + SPACING
+                continue
+            height = self._text_height(text, font, width)
+            painter.setFont(font)
+            painter.drawText(QRect(left, y, width, height), Qt.TextWordWrap, text)
+            y += height + SPACING
+        painter.restore()
+
+
+class LearnView(QListView):
+    """Learn mode list that only lays out and paints the rows in view, in batches."""
+
+    def __init__(self, questions, question_font, image_folder=None, thumbnails=None, parent=None):
+        super().__init__(parent)
+        self.setModel(LearnModel(questions, image_folder, thumbnails, parent=self))
+        self.setItemDelegate(LearnDelegate(question_font, self))
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setUniformItemSizes(False)
+        self.setLayoutMode(QListView.Batched)  # Keeps the window responsive while a huge topic is laid out
+        self.setBatchSize(200)
+        self.setResizeMode(QListView.Adjust)  # Re-wraps the text when the width changes
+
+    def image_ready(self, image_path):
+        self.model().image_ready(image_path)
@@ -0,0 +1,75 @@
+import json
+import os
+
+from question_bank import file_sha1, file_signature
+
+
+DEFAULT_MANIFEST_FILE = "learning_data_manifest.json"
+
+
+def load_manifest(manifest_file=DEFAULT_MANIFEST_FILE):
+    """Loads the {lesson path: signature, content hash and topics} manifest of the last learning data sync."""
+    if not os.path.exists(manifest_file):
+        return {}
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error reading manifest {manifest_file}, doing a full sync: {e}")
+        return {}
+
+
+def save_manifest(manifest, manifest_file=DEFAULT_MANIFEST_FILE):
+    """Saves the sync manifest to file."""
+    try:
+        with open(manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=4)
+    except OSError as e:
+        print(f"Error saving manifest {manifest_file}: {e}")
+
+
+def list_category_lessons(learning_section_directory):
+    """Yields (category, lesson, path) for every lesson JSON file inside a category folder."""
+    for category in os.listdir(learning_section_directory):
+        category_path = os.path.join(learning_section_directory, category)
+        if not os.path.isdir(category_path):
+            continue
+        for file_name in os.listdir(category_path):
+            if file_name.endswith('.json'):
+                yield category, os.path.splitext(file_name)[0], os.path.join(category_path, file_name)
+
+
+def sync_learning_data(learning_data, learning_section_directory, manifest, read_topics):
+    """Adds topics of new or modified lessons to learning_data without touching existing counts.
+
+    Only lessons whose file signature changed are hashed, and only lessons whose content
+    hash changed are re-read through read_topics(category, lesson). The topics of every
+    lesson are kept in the manifest, so topics missing from learning_data (e.g. after it
+    was restored from a backup) are added back without reading the lesson. Returns True if
+    learning_data or the manifest changed and need saving.
+    """
+    changed = False
+    for category, lesson, path in list_category_lessons(learning_section_directory):
+        key = f"{category}/{lesson}"
+        signature = file_signature(path)
+        entry = manifest.get(key)
+        if entry and entry.get("signature") == signature and "topics" in entry:
+            topics = entry["topics"]
+        else:
+            sha1 = file_sha1(path)
+            if entry and entry.get("sha1") == sha1 and "topics" in entry:
+                topics = entry["topics"]  # Touched or copied but not modified
+            else:
+                topics = [topic.strip() for topic in read_topics(category, lesson)]
+            manifest[key] = {"signature": signature, "sha1": sha1, "topics": topics}
+            changed = True
+
+        # Add category, lesson and topics if they don't exist yet
+        lesson_topics = learning_data.get(category.strip(), {}).get(lesson.strip(), {})
+        missing = [topic for topic in topics if topic not in lesson_topics]
+        if missing:
+            lesson_topics = learning_data.setdefault(category.strip(), {}).setdefault(lesson.strip(), {})
+            for topic in missing:
+                lesson_topics[topic] = 0
+            changed = True
+    return changed
@@ -6,10 +6,12 @@ from datetime import datetime
 from rapidfuzz import fuzz
 from PIL import Image
 from tabulate import tabulate
+from results_store import open_results_store
 
 class QuizMaster:
     def __init__(self, config_file):
         self.load_config(config_file)
+        self.results_store = open_results_store(self.config)
         self.data = {}
         self.results = []
 
@@ -68,24 +70,8 @@ class QuizMaster:
 
     def update_learning_data(self, category, lesson, topic):
         """Update the learning count for a given topic in a given category and lesson."""
-        # Load existing learning data
-        learning_data = self.load_learning_data()
-
-        # Ensure category exists in learning data
-        if category not in learning_data:
-            learning_data[category] = {}
-
-        # Ensure lesson exists in the category
-        if lesson not in learning_data[category]:
-            learning_data[category][lesson] = {}
-
-        # Ensure topic exists and increment the count
-        if topic not in learning_data[category][lesson]:
-            learning_data[category][lesson][topic] = 0
-        learning_data[category][lesson][topic] += 1
-
-        # Save the updated learning data
-        self.save_learning_data(learning_data)
+        # Counts live in the results store; learning_data.json only tracks the available topics
+        self.results_store.increment_learning_count(category, lesson.replace(".json", ""), topic)
 
     def update_learning_data_with_new_topics(self, learning_data):
         """Update the learning data to add new topics from JSON files, without modifying existing data."""
@@ -123,6 +109,7 @@ class QuizMaster:
     def display_learning_data(self):
         """Display the hierarchical learning data in a tree format with color."""
         learning_data = self.load_learning_data()
+        learning_counts = self.results_store.learning_counts()
 
         # ANSI color codes
         colors = {
@@ -136,7 +123,8 @@ class QuizMaster:
             print(f"{colors['category']}{category}/{colors['reset']}")
             for lesson, topics in lessons.items():
                 print(f"{colors['lesson']}├── Lesson: {lesson}{colors['reset']}")
-                for topic, count in topics.items():
+                for topic in topics:
+                    count = learning_counts.get(category, {}).get(lesson, {}).get(topic, 0)
                     print(f"{colors['topic']}│   ├── Topic: {topic} ({count} tests taken){colors['reset']}")
             print("")
 
@@ -253,8 +241,6 @@ class QuizMaster:
         print("Practice completed.")
 
     def record_result(self, topic, time_taken):
-        result_file_name = os.path.join(self.results_directory,
-                                        f"{os.path.splitext(self.data_file.replace('/', '_'))[0]}_{topic}_result.json")
         result_data = {
             "date_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "time_taken_minutes": round(time_taken, 2),
@@ -262,16 +248,8 @@ class QuizMaster:
             "wrong_answers": len([r for r in self.results if r['result'] == 'wrong']),
             "practice_sessions": len(self.results)
         }
-        if os.path.exists(result_file_name):
-            with open(result_file_name, 'r', encoding='utf-8') as result_file:
-                all_results = json.load(result_file)
-        else:
-            all_results = []
-
-        all_results.append(result_data)
-        with open(result_file_name, 'w', encoding='utf-8') as result_file:
-            json.dump(all_results, result_file, indent=4)
-        print(f"Results recorded in {result_file_name}")
+        self.results_store.record_session(self.current_category, self.data_file, topic, result_data)
+        print(f"Results recorded for {self.current_category}/{self.data_file}/{topic}")
 
     def run_quiz(self, topic, mode):
         """Runs the quiz or learn mode for the selected topic."""
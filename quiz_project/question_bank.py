@@ -0,0 +1,309 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from quiz_model import Lesson, Question
+
+
+# Layout of the compiled index file:
+#   MAGIC | header offset (uint64) | header length (uint64) | topic blobs ... | header JSON
+# Every topic blob is a UTF-8 JSON list of compact question records (see
+# quiz_model.Question.to_record), so a topic is decoded straight from the memory map
+# without touching the other topics, with its answers already split and normalized.
+MAGIC = b"LTQBANK1"
+PREAMBLE = struct.Struct("<8sQQ")
+INDEX_VERSION = 5
+DEFAULT_INDEX_NAME = ".question_bank.idx"
+# Lesson files are read in chunks of this size while compiling
+READ_CHUNK_CHARS = 1 << 20
+
+
+def file_signature(path):
+    """Returns the cheap [mtime, size, ctime, inode] signature used to detect a changed source file.
+
+    ctime and inode change whenever a file is replaced or copied over, so a lesson restored
+    with its old mtime and size (cp -p, a git checkout on a coarse-mtime file system) is
+    still noticed and then compared by content hash.
+    """
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size, stat.st_ctime_ns, stat.st_ino]
+
+
+def file_sha1(path):
+    """Returns the SHA-1 hex digest of a file's content."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def list_lesson_files(learning_section_directory):
+    """Maps every lesson key (e.g. "maths/addition") to its JSON file path."""
+    lesson_files = {}
+    for root, dirs, files in os.walk(learning_section_directory):
+        for file in files:
+            if file.endswith('.json'):
+                path = os.path.join(root, file)
+                relative_path = os.path.relpath(path, learning_section_directory)
+                lesson_files[relative_path[:-len('.json')].replace('\\', '/')] = path
+    return lesson_files
+
+
+def iter_topics(path, chunk_chars=READ_CHUNK_CHARS):
+    """Yields (topic, questions) from a lesson file one topic at a time.
+
+    Only the topic being decoded is held in memory, so compiling a lesson of several
+    hundred MB never materializes the whole file the way json.load would.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ""
+        position = 0
+        eof = False
+
+        def fill(min_chars):
+            # Drops the consumed prefix and reads at least min_chars more (or up to EOF)
+            nonlocal buffer, position, eof
+            buffer = buffer[position:]
+            position = 0
+            while not eof and len(buffer) < min_chars:
+                chunk = f.read(max(chunk_chars, min_chars - len(buffer)))
+                eof = not chunk
+                buffer += chunk
+
+        def skip_whitespace():
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer) or eof:
+                    return
+                fill(1)
+
+        def decode_value():
+            # Grows the buffer until the next complete JSON value fits into it
+            nonlocal position
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    # A value ending exactly at the buffer end may be a number cut in half
+                    if end < len(buffer) or eof:
+                        position = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill(2 * (len(buffer) - position) + chunk_chars)
+
+        def expect(char):
+            nonlocal position
+            skip_whitespace()
+            if buffer[position:position + 1] != char:
+                raise ValueError(f"Expected '{char}' in lesson file {path}")
+            position += 1
+
+        expect('{')
+        skip_whitespace()
+        if buffer[position:position + 1] == '}':
+            return
+        while True:
+            skip_whitespace()
+            topic = decode_value()
+            expect(':')
+            skip_whitespace()
+            yield topic, decode_value()
+            skip_whitespace()
+            if buffer[position:position + 1] == ',':
+                position += 1
+                continue
+            expect('}')
+            return
+
+
+class QuestionBank:
+    """Compiled, memory-mapped index over every lesson in the learning section."""
+
+    def __init__(self, learning_section_directory, index_path=None):
+        self.learning_section_directory = learning_section_directory
+        self.index_path = index_path or os.path.join(learning_section_directory, DEFAULT_INDEX_NAME)
+        self._file = None
+        self._map = None
+        self.header = {"version": INDEX_VERSION, "lessons": {}}
+        self._topic_offsets = {}
+        self.open()
+
+    def open(self):
+        """Opens the index file, rebuilding it if it is missing, corrupt or stale."""
+        if not self._load_index():
+            self.rebuild()
+        else:
+            self.refresh()
+
+    def close(self):
+        """Releases the memory map and the underlying file handle."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _load_index(self):
+        """Maps the index file into memory and parses its header; returns False if unusable."""
+        self.close()
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            self._file = open(self.index_path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, header_offset, header_length = PREAMBLE.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError("bad magic")
+            header = json.loads(self._map[header_offset:header_offset + header_length].decode('utf-8'))
+            if header.get("version") != INDEX_VERSION:
+                raise ValueError("unsupported version")
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Question bank index {self.index_path} is unusable, rebuilding: {e}")
+            self.close()
+            return False
+
+        self.header = header
+        self._topic_offsets = {
+            lesson: {name: (offset, length) for name, offset, length, count in entry["topics"]}
+            for lesson, entry in header["lessons"].items()
+        }
+        return True
+
+    def refresh(self):
+        """Rebuilds the index if any lesson file was added, removed or modified."""
+        lesson_files = list_lesson_files(self.learning_section_directory)
+        indexed = self.header["lessons"]
+        if set(lesson_files) != set(indexed) or any(
+                self._is_stale(lesson, path) for lesson, path in lesson_files.items()):
+            self.rebuild(lesson_files)
+
+    def _is_stale(self, lesson, path):
+        """Checks a single lesson file against its entry in the index header."""
+        entry = self.header["lessons"].get(lesson)
+        if entry is None:
+            return True
+        try:
+            return file_signature(path) != entry["signature"]
+        except OSError:
+            return True
+
+    def _ensure_fresh(self, lesson):
+        """Stats just the requested lesson file and rebuilds the index if it changed."""
+        path = os.path.join(self.learning_section_directory, lesson + '.json')
+        if self._is_stale(lesson, path):
+            self.rebuild()
+
+    def rebuild(self, lesson_files=None):
+        """Compiles all lesson files into a fresh index, reusing blobs of unchanged lessons."""
+        if lesson_files is None:
+            lesson_files = list_lesson_files(self.learning_section_directory)
+        old_lessons = self.header["lessons"] if self._map is not None else {}
+
+        lessons = {}
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'wb') as out:
+            out.write(PREAMBLE.pack(MAGIC, 0, 0))
+            for lesson in sorted(lesson_files):
+                path = lesson_files[lesson]
+                signature = file_signature(path)
+                old_entry = old_lessons.get(lesson)
+
+                # Same signature, or same content after a touch: copy the compiled blobs over
+                if old_entry and old_entry["signature"] == signature:
+                    sha1 = old_entry["sha1"]
+                else:
+                    sha1 = file_sha1(path)
+                if old_entry and old_entry["sha1"] == sha1:
+                    topics = [[name, self._copy_blob(out, offset, length), length, count]
+                              for name, offset, length, count in old_entry["topics"]]
+                else:
+                    topics = self._compile_lesson(out, path)
+
+                lessons[lesson] = {"signature": signature, "sha1": sha1, "topics": topics}
+
+            header = json.dumps({"version": INDEX_VERSION, "lessons": lessons}).encode('utf-8')
+            header_offset = out.tell()
+            out.write(header)
+            out.seek(0)
+            out.write(PREAMBLE.pack(MAGIC, header_offset, len(header)))
+
+        # The old map must be released before the file can be replaced (Windows)
+        self.close()
+        os.replace(temp_path, self.index_path)
+        self._load_index()
+
+    def _copy_blob(self, out, offset, length):
+        """Copies a compiled topic blob from the current index into the new one."""
+        new_offset = out.tell()
+        out.write(self._map[offset:offset + length])
+        return new_offset
+
+    def _compile_lesson(self, out, path):
+        """Streams one lesson file and writes a blob per topic; returns the topic table."""
+        topics = []
+        for name, questions in iter_topics(path):
+            if not isinstance(questions, list):
+                print(f"Skipping topic '{name}' in {path}: expected a list of questions")
+                questions = []
+            questions = [Question.from_dict(question).to_record() for question in questions
+                         if isinstance(question, dict)]
+            blob = json.dumps(questions, ensure_ascii=False).encode('utf-8')
+            topics.append([name, out.tell(), len(blob), len(questions)])
+            out.write(blob)
+        return topics
+
+    def lessons(self):
+        """Returns all indexed lesson keys, sorted."""
+        return sorted(self.header["lessons"])
+
+    def topic_offsets(self, lesson):
+        """Returns the {topic: (offset, length)} table of a lesson."""
+        self._ensure_fresh(lesson)
+        if lesson not in self._topic_offsets:
+            raise KeyError(lesson)
+        return self._topic_offsets[lesson]
+
+    def topics(self, lesson):
+        """Returns the topic names of a lesson in file order."""
+        return list(self.topic_offsets(lesson))
+
+    def questions(self, lesson, topic):
+        """Returns a fresh list of the Questions of a topic, decoded from the memory map."""
+        offset, length = self.topic_offsets(lesson)[topic]
+        return [Question.from_record(record)
+                for record in json.loads(self._map[offset:offset + length].decode('utf-8'))]
+
+    def lesson(self, lesson):
+        """Returns a lazy topic -> Topic mapping for a lesson."""
+        self.topic_offsets(lesson)
+        return Lesson(lesson, self)
+
+
+def open_question_bank(config):
+    """Opens the question bank for a loaded config dict."""
+    return QuestionBank(config['learning_section_directory'], config.get('question_bank_index'))
+
+
+def main():
+    config_file = sys.argv[1] if len(sys.argv) > 1 else "config.json"
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+
+    bank = open_question_bank(config)
+    bank.rebuild()
+    for lesson in bank.lessons():
+        print(f"{lesson}: {len(bank.topics(lesson))} topics")
+    print(f"Question bank compiled to {bank.index_path}")
+    bank.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,13 @@ from datetime import datetime
 from rapidfuzz import fuzz
 from PIL import Image
 from tabulate import tabulate
+from results_store import open_results_store
 
 
 class QuizMaster:
     def __init__(self, config_file):
         self.load_config(config_file)
+        self.results_store = open_results_store(self.config)
         self.data = {}
         self.results = []
 
@@ -148,8 +150,6 @@ class QuizMaster:
 
     def record_result(self, topic, time_taken):
         """Records the results of the quiz."""
-        result_file_name = os.path.join(self.results_directory,
-                                        f"{os.path.splitext(self.data_file)[0]}_{topic}_result.json")
         result_data = {
             "date_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "time_taken_minutes": round(time_taken, 2),
@@ -157,16 +157,8 @@ class QuizMaster:
             "wrong_answers": len([r for r in self.results if r['result'] == 'wrong']),
             "practice_sessions": len(self.results)
         }
-        if os.path.exists(result_file_name):
-            with open(result_file_name, 'r', encoding='utf-8') as result_file:
-                all_results = json.load(result_file)
-        else:
-            all_results = []
-
-        all_results.append(result_data)
-        with open(result_file_name, 'w', encoding='utf-8') as result_file:
-            json.dump(all_results, result_file, indent=4)
-        print(f"Results recorded in {result_file_name}")
+        self.results_store.record_session("", self.data_file, topic, result_data)
+        print(f"Results recorded for {self.data_file}/{topic}")
 
     def run_quiz(self, topic, mode):
         """Runs the quiz or learn mode for the selected topic."""
@@ -7,19 +7,43 @@ from datetime import datetime
 from collections import defaultdict
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QComboBox,
-    QMessageBox, QHBoxLayout, QScrollArea, QLineEdit, QInputDialog
+    QMessageBox, QHBoxLayout, QScrollArea, QInputDialog
 )
-from PyQt5.QtGui import (QFont,QPixmap)
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont, QImage
+from PyQt5.QtCore import QTimer, pyqtSignal
 from tabulate import tabulate
-from rapidfuzz import fuzz
+from answer_matcher import AnswerMatcher
+from answer_timing import AnswerTimer
+from answer_view import AnswerView
+from learn_view import LearnView
+from question_bank import open_question_bank
+from results_store import open_results_store
+from thumbnail_cache import ThumbnailLoader, open_thumbnail_cache
 
 
 class QuizMaster(QWidget):
+    thumbnail_ready = pyqtSignal(str)  # Emitted from loader threads, delivered on the GUI thread
+
     def __init__(self):
         super().__init__()
         self.config = self.load_config("config.json")
+        # Question images are scaled and decoded in the background, cached on disk and in memory
+        self.thumbnails = ThumbnailLoader(open_thumbnail_cache(self.config), decode=QImage,
+                                          on_ready=self.thumbnail_ready.emit)
+        self.thumbnail_ready.connect(self.on_thumbnail_ready)
+        self.learn_view = None
         self.results_directory = self.config.get('results_directory', 'results')
+        self.question_bank = open_question_bank(self.config)
+        self.results_store = open_results_store(self.config, self.question_bank)
+        self.answer_matcher = AnswerMatcher(self.config['fuzzy_search_threshold'])
+        # "inline" shows results in a banner and practices in the answer field; "dialog" uses message boxes
+        self.inline_feedback = self.config.get('feedback', 'inline') == 'inline'
+        self.practice_attempts_left = 0
+        # After a wrong answer and its practice, move on by itself (or on Enter) once the feedback was read
+        self.advance_timer = QTimer(self)
+        self.advance_timer.setSingleShot(True)
+        self.advance_timer.setInterval(self.config.get('feedback_delay_ms', 1500))
+        self.advance_timer.timeout.connect(self.display_next_part_of_question)
         self.initUI()
         self.load_subjects()
 
@@ -58,15 +82,22 @@ class QuizMaster(QWidget):
         self.learn_button.clicked.connect(self.on_learn_clicked)
         self.test_button = QPushButton("Test")
         self.test_button.clicked.connect(self.on_test_clicked)
+        self.drill_button = QPushButton("Drill Weak")
+        self.drill_button.clicked.connect(self.on_drill_clicked)
         self.learn_button.setStyleSheet("background-color: #5bc0de; color: white; font-size: 16px; padding: 10px;")
         self.test_button.setStyleSheet("background-color: #5cb85c; color: white; font-size: 16px; padding: 10px;")
+        self.drill_button.setStyleSheet("background-color: #d9534f; color: white; font-size: 16px; padding: 10px;")
 
         button_layout = QHBoxLayout()
         button_layout.addWidget(self.learn_button)
         button_layout.addWidget(self.test_button)
+        button_layout.addWidget(self.drill_button)
 
         main_layout.addLayout(button_layout)
 
+        # Set font size for question label
+        self.question_font = QFont("Arial", 18, QFont.Bold)
+
         # Scrollable Area for Questions and Answers
         self.scroll_area = QScrollArea()
         self.scroll_area.setWidgetResizable(True)
@@ -74,11 +105,15 @@ class QuizMaster(QWidget):
         self.scroll_area.setWidget(self.content_widget)
         self.content_layout = QVBoxLayout(self.content_widget)
 
+        # Test mode view, created once and updated for every answer
+        self.answer_view = AnswerView(self.question_font, self.thumbnails)
+        self.answer_view.submitted.connect(self.submit_part_answer)
+        self.answer_view.hide()
+        self.content_layout.addWidget(self.answer_view)
+
         main_layout.addWidget(self.scroll_area)
         self.setLayout(main_layout)
 
-        # Set font size for question label
-        self.question_font = QFont("Arial", 18, QFont.Bold)
 
     def load_config(self, config_file):
         with open(config_file, 'r') as f:
@@ -91,32 +126,20 @@ class QuizMaster(QWidget):
 
     def load_topics(self):
         selected_subject = self.subject_dropdown.currentText()
-        learning_section_directory = self.config['learning_section_directory']
-        data_file_path = os.path.join(learning_section_directory, selected_subject + '.json')
-        with open(data_file_path, 'r') as f:
-            self.data = json.load(f)
+        self.data = self.question_bank.lesson(selected_subject)
         topics = list(self.data.keys())
         self.topic_dropdown.clear()
         self.topic_dropdown.addItems(topics)
 
     def show_learning_overview(self):
-        learning_counts_file = os.path.join(self.results_directory, "learning_counts.json")
-
-        if os.path.exists(learning_counts_file):
-            with open(learning_counts_file, 'r', encoding='utf-8') as f:
-                learning_counts = json.load(f)
-        else:
-            learning_counts = {}
+        learning_counts = self.results_store.learning_counts().get("", {})
 
         # Load all topics from the learning section
         all_topics = defaultdict(list)
-        learning_section_directory = self.config['learning_section_directory']
-        for file_name in os.listdir(learning_section_directory):
-            if file_name.endswith('.json'):
-                subject = file_name.replace('.json', '')
-                with open(os.path.join(learning_section_directory, file_name), 'r') as f:
-                    data = json.load(f)
-                    all_topics[subject].extend(data.keys())
+        self.question_bank.refresh()
+        for subject in self.question_bank.lessons():
+            if '/' not in subject:
+                all_topics[subject].extend(self.question_bank.topics(subject))
 
         # Build the overview message
         overview_message = ""
@@ -141,20 +164,45 @@ class QuizMaster(QWidget):
         self.mode = "test"
         self.start_quiz()
 
+    def on_drill_clicked(self):
+        self.mode = "drill"
+        self.start_quiz()
+
     def start_quiz(self):
         self.selected_subject = self.subject_dropdown.currentText()
         self.selected_topic = self.topic_dropdown.currentText()
 
-        self.questions = self.data[self.selected_topic]
-        random.shuffle(self.questions)  # Shuffle questions for unbiased learning
+        self.questions = self.data[self.selected_topic].questions
+        if self.mode == "drill":
+            # Drill the most often missed questions, answered like a test
+            self.questions = self.weak_questions(self.questions)
+            if not self.questions:
+                QMessageBox.information(self, "Drill", f"No question in '{self.selected_topic}' has been missed yet.")
+                return
+            self.mode = "test"
+        else:
+            random.shuffle(self.questions)  # Shuffle questions for unbiased learning
         self.current_question_index = 0
 
         self.correct_answers = 0
         self.incorrect_answers = 0
+        self.practice_attempts_left = 0
+        self.advance_timer.stop()
+        self.answer_view.clear_feedback()
         self.start_time = time.time()
 
         self.display_question()
 
+    def weak_questions(self, questions):
+        """Returns the questions with the most often missed prompts, worst first."""
+        weakest = self.results_store.weakest_questions("", self.selected_subject, self.selected_topic,
+                                                       self.config.get('weak_question_limit', 10))
+        rank = {stats["question"]: index for index, stats in enumerate(weakest)}
+        weak_questions = [question for question in questions if any(part.prompt in rank for part in question.parts)]
+        weak_questions.sort(key=lambda question: min(rank[part.prompt] for part in question.parts
+                                                     if part.prompt in rank))
+        return weak_questions
+
     def display_question(self):
         if self.mode == "learn":
             self.display_all_content()
@@ -163,128 +211,132 @@ class QuizMaster(QWidget):
 
     def display_all_content(self):
         self.clear_content()
-        serial_number = 1
-        for question_data in self.questions:
-            question_label = QLabel(f"{serial_number}. {question_data.get('question', '')}")
-            question_label.setFont(self.question_font)
-            self.content_layout.addWidget(question_label)
-
-            if 'image' in question_data:
-                image_path = os.path.join(self.config['image_directory'], self.selected_subject, self.selected_topic, question_data['image'])
-                if os.path.exists(image_path):
-                    image_label = QLabel()
-                    pixmap = QPixmap(image_path)
-                    image_label.setPixmap(pixmap.scaled(300, 300, Qt.KeepAspectRatio))
-                    self.content_layout.addWidget(image_label)
-                else:
-                    image_label = QLabel("Image not found")
-                    self.content_layout.addWidget(image_label)
+        # Only the rows in view are laid out and painted, so huge topics open at once
+        image_folder = os.path.join(self.config['image_directory'], self.selected_subject, self.selected_topic)
+        self.learn_view = LearnView(self.questions, self.question_font, image_folder, self.thumbnails)
+        self.content_layout.addWidget(self.learn_view)
 
-            for key, value in question_data.items():
-                if key not in ['question', 'type', 'image']:
-                    answer_label = QLabel(f"{key}: {value.split('@')[0]}")
-                    self.content_layout.addWidget(answer_label)
-                    if '@' in value:
-                        info_label = QLabel(f"   Info: {value.split('@')[1]}")
-                        self.content_layout.addWidget(info_label)
+    def image_path(self, question):
+        return os.path.join(self.config['image_directory'], self.selected_subject, self.selected_topic, question.image)
 
-            serial_number += 1
+    def on_thumbnail_ready(self, image_path):
+        if self.learn_view is not None:
+            self.learn_view.image_ready(image_path)
+        self.answer_view.image_ready(image_path)
 
     def display_test_content(self):
         self.clear_content()
-        self.current_question_data = self.questions[self.current_question_index]
+        self.current_question = self.questions[self.current_question_index]
+        # Load the images of the next questions while this one is answered
+        upcoming = self.questions[self.current_question_index + 1:
+                                  self.current_question_index + 1 + self.config.get('image_prefetch_questions', 3)]
+        self.thumbnails.prefetch([self.image_path(question) for question in upcoming if question.image])
+        # Parts still to be answered, pre-split and pre-normalized when the lesson was compiled
+        self.remaining_parts = list(self.current_question.parts)
         self.current_answer_list = None
         self.display_next_part_of_question()
 
     def display_next_part_of_question(self):
-        self.clear_content()
+        self.answer_timer = AnswerTimer()
 
         if not self.current_answer_list:
-            if not self.current_question_data:
+            if not self.remaining_parts:
                 self.current_question_index += 1
                 if self.current_question_index < len(self.questions):
                     self.display_test_content()
                 else:
+                    self.clear_content()
                     self.end_quiz()
                 return
 
             # Get the next part of the question
-            next_parts = [(k, v) for k, v in self.current_question_data.items()
-                          if k not in ['question', 'type', 'image'] and not k.startswith('_') and v]
-            if not next_parts:
-                self.current_question_index += 1
-                if self.current_question_index < len(self.questions):
-                    self.display_test_content()
-                else:
-                    self.end_quiz()
-                return
-            self.current_question_part_key, self.current_question_part_value = next_parts[0]
-            self.current_answer_list = [ans.strip().lower() for ans in self.current_question_part_value.split('@')[0].split(';')]
-
-            # Display the main question if available
-            main_question = self.current_question_data.get('question', '')
-            if main_question:
-                question_label = QLabel(main_question)
-                question_label.setFont(self.question_font)
-                self.content_layout.addWidget(question_label)
-
-        # Display the current part of the question
-        question_part_label = QLabel(f"{self.current_question_part_key} ({len(self.current_answer_list)} answers remaining)")
-        question_part_label.setFont(self.question_font)
-        self.content_layout.addWidget(question_part_label)
-
-        if 'image' in self.current_question_data:
-            image_path = os.path.join(self.config['image_directory'], self.selected_subject, self.selected_topic, self.current_question_data['image'])
-            if os.path.exists(image_path):
-                image_label = QLabel()
-                pixmap = QPixmap(image_path)
-                image_label.setPixmap(pixmap.scaled(300, 300, Qt.KeepAspectRatio))
-                self.content_layout.addWidget(image_label)
-
-        # Answer input field
-        self.answer_input = QLineEdit()
-        self.answer_input.setPlaceholderText(f"Answer for {self.current_question_part_key}")
-        self.content_layout.addWidget(self.answer_input)
-        self.answer_input.setFocus()
-
-        # Submit button
-        submit_button = QPushButton("Submit Answer")
-        submit_button.setStyleSheet("background-color: #4CAF50; color: white; padding: 10px;")
-        submit_button.clicked.connect(self.submit_part_answer)
-        self.content_layout.addWidget(submit_button)
-
-        # Connect Enter key to submit answer
-        self.answer_input.returnPressed.connect(self.submit_part_answer)
+            part = self.remaining_parts.pop(0)
+            self.current_question_part_key = part.prompt
+            self.current_answer_list = list(part.answers)
+            self.current_normalized_answers = list(part.normalized)
 
-    def submit_part_answer(self):
-        user_answer = self.answer_input.text().strip().lower()
-        matched = any(
-            fuzz.ratio(user_answer, ans) >= self.config['fuzzy_search_threshold'] for ans in self.current_answer_list)
-
-        if matched:
-            matched_answer = next(ans for ans in self.current_answer_list if
-                                  fuzz.ratio(user_answer, ans) >= self.config['fuzzy_search_threshold'])
-            self.current_answer_list.remove(matched_answer)
-            QMessageBox.information(self, "Correct", f"'{matched_answer}' is correct!")
-            self.correct_answers += 1
+        image_path = self.image_path(self.current_question) if self.current_question.image else None
 
-            if not self.current_answer_list:
-                self.current_question_data[self.current_question_part_key] = ""  # Mark this part as answered
+        # Update the persistent test view in place instead of rebuilding it
+        self.answer_view.show_part(self.current_question.text, self.current_question_part_key,
+                                   len(self.current_answer_list), image_path)
+        self.answer_view.show()
+        self.answer_timer.lap("display")
 
-                # Move to the next part of the question or to the next question
-                self.display_next_part_of_question()
+    def submit_part_answer(self):
+        if self.advance_timer.isActive():
+            # Enter skips the rest of the feedback delay
+            self.advance_timer.stop()
+            self.display_next_part_of_question()
+            return
+        if self.practice_attempts_left:
+            self.check_practice_answer()
+            return
+
+        self.answer_timer.lap("input_wait")
+        user_answer = self.answer_view.answer()
+        # One scoring pass over all remaining (pre-normalized) answers, keeping the best match
+        with self.answer_timer.stage("matching"):
+            match = self.answer_matcher.best_match(user_answer, self.current_normalized_answers)
+        self.results_store.record_answer("", self.selected_subject, self.selected_topic, self.current_question_part_key,
+                                         bool(match), self.answer_timer.durations_ns["input_wait"] / 1e9)
+        self.results_store.record_timings("", self.selected_subject, self.selected_topic,
+                                          self.current_question_part_key, "test", self.answer_timer)
+
+        if match:
+            index, score = match
+            matched_answer = self.current_answer_list.pop(index)
+            del self.current_normalized_answers[index]
+            if self.inline_feedback:
+                self.answer_view.show_feedback(f"'{matched_answer}' is correct!", True)
             else:
-                # Still more answers remaining for this question part
-                self.display_next_part_of_question()
+                QMessageBox.information(self, "Correct", f"'{matched_answer}' is correct!")
+            self.correct_answers += 1
+
+            # Ask for the remaining answers of this part, or move to the next part or question
+            self.display_next_part_of_question()
         else:
             correct_answer = "; ".join(self.current_answer_list)
-            QMessageBox.warning(self, "Incorrect", f"Incorrect. The correct answer is: {correct_answer}")
             self.incorrect_answers += 1
-            self.practice_wrong_answer(correct_answer, self.current_question_part_key)
+            if self.inline_feedback:
+                self.answer_view.show_feedback(f"Incorrect. The correct answer is: {correct_answer}", False)
+                self.start_practice(correct_answer, self.current_question_part_key)
+            else:
+                QMessageBox.warning(self, "Incorrect", f"Incorrect. The correct answer is: {correct_answer}")
+                self.practice_wrong_answer(correct_answer, self.current_question_part_key)
 
         # Clear the input field and set focus back to it
-        self.answer_input.clear()
-        self.answer_input.setFocus()  # Ensure focus is on the input field after dialog
+        self.answer_view.clear_answer()  # Ensure focus is on the input field after dialog
+
+    def start_practice(self, correct_answer, key):
+        """Practices a missed answer inline: each attempt is typed into the answer field."""
+        self.practice_answer = correct_answer
+        self.practice_key = key
+        self.practice_attempts_left = self.config['practice_attempts']
+        if self.practice_attempts_left:
+            self.ask_practice_attempt()
+        else:
+            self.advance_timer.start()
+
+    def ask_practice_attempt(self):
+        attempt = self.config['practice_attempts'] - self.practice_attempts_left + 1
+        self.answer_view.show_prompt(f"Practice {attempt}/{self.config['practice_attempts']}: {self.practice_key}",
+                                     f"Type: {self.practice_answer}")
+
+    def check_practice_answer(self):
+        answer = self.answer_view.answer()
+        correct = self.answer_matcher.is_match(answer.strip().lower(), self.practice_answer.lower())
+        result = "Correct!" if correct else f"Incorrect. The correct answer is: {self.practice_answer}."
+        self.practice_attempts_left -= 1
+        if self.practice_attempts_left:
+            self.answer_view.show_feedback(result, correct)
+            self.ask_practice_attempt()
+        else:
+            self.answer_view.show_feedback(
+                f"{result} You have completed {self.config['practice_attempts']} practice attempts.", correct)
+            self.answer_view.clear_answer()
+            # Continue to the next part of the question or the next question
+            self.advance_timer.start()
 
     def practice_wrong_answer(self, correct_answer, key):
         for attempt in range(self.config['practice_attempts']):
@@ -294,8 +346,7 @@ class QuizMaster(QWidget):
                 f"Practice: {key}"
             )
 
-            if ok and fuzz.ratio(answer.strip().lower(), correct_answer.lower()) >= self.config[
-                'fuzzy_search_threshold']:
+            if ok and self.answer_matcher.is_match(answer.strip().lower(), correct_answer.lower()):
                 QMessageBox.information(self, "Correct", "Correct!")
             else:
                 QMessageBox.warning(self, "Incorrect",
@@ -309,90 +360,44 @@ class QuizMaster(QWidget):
         self.display_next_part_of_question()
 
     def clear_content(self):
+        # The test view is kept for the next quiz; everything else is deleted
+        self.answer_view.hide()
+        self.learn_view = None
         for i in reversed(range(self.content_layout.count())):
             widget_to_remove = self.content_layout.itemAt(i).widget()
+            if widget_to_remove is self.answer_view:
+                continue
             self.content_layout.removeWidget(widget_to_remove)
             widget_to_remove.deleteLater()
 
     def end_quiz(self):
         end_time = time.time()
         time_taken = round((end_time - self.start_time) / 60, 2)  # Time taken in minutes
-        result_data = {
-            "date_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "correct_answers": self.correct_answers,
-            "incorrect_answers": self.incorrect_answers,
-            "time_taken": time_taken
-        }
-
-        result_file_name = f"{self.selected_subject}_{self.selected_topic}_results.json"
-        result_file_path = os.path.join(self.results_directory, result_file_name)
-
-        if os.path.exists(result_file_path):
-            with open(result_file_path, 'r') as f:
-                results = json.load(f)
-        else:
-            results = []
 
-        results.append(result_data)
-
-        with open(result_file_path, 'w') as f:
-            json.dump(results, f, indent=4)
-
-        # Ensure learning count is updated
+        # Record the result once (this also updates the learning count) and show the history
         self.record_result(self.selected_topic, time_taken)
-        self.display_results(results)
+        self.display_results(self.results_store.sessions("", self.selected_subject, self.selected_topic))
 
     def display_results(self, results):
         headers = ["Date Time", "Correct Answers", "Incorrect Answers", "Time Taken (minutes)"]
-        table_data = [[r["date_time"], r["correct_answers"], r["incorrect_answers"], r["time_taken"]] for r in results]
+        table_data = [[r["date_time"], r["correct_answers"], r["wrong_answers"], r["time_taken_minutes"]] for r in results]
 
         results_table = tabulate(table_data, headers, tablefmt="grid")
         QMessageBox.information(self, "Quiz Results", results_table)
 
     def record_result(self, topic, time_taken):
-        result_file_name = os.path.join(self.results_directory, f"{self.selected_subject}_{topic}_results.json")
         result_data = {
             "date_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "correct_answers": self.correct_answers,
-            "incorrect_answers": self.incorrect_answers,
-            "time_taken": time_taken
+            "wrong_answers": self.incorrect_answers,
+            "time_taken_minutes": time_taken
         }
 
-        if os.path.exists(result_file_name):
-            with open(result_file_name, 'r', encoding='utf-8') as result_file:
-                all_results = json.load(result_file)
-        else:
-            all_results = []
-
-        all_results.append(result_data)
-
-        with open(result_file_name, 'w', encoding='utf-8') as result_file:
-            json.dump(all_results, result_file, indent=4)
+        # GUI lessons live directly in the learning section, so they have no category
+        self.results_store.record_session("", self.selected_subject, topic, result_data)
 
         # Update learning count
-        self.update_learning_count(self.selected_subject, topic)
-
-    def update_learning_count(self, subject, topic):
-        learning_counts_file = os.path.join(self.config['results_directory'], "learning_counts.json")
-
-        os.makedirs(self.config['results_directory'], exist_ok=True)
-
-        if os.path.exists(learning_counts_file):
-            with open(learning_counts_file, 'r', encoding='utf-8') as f:
-                learning_counts = json.load(f)
-        else:
-            learning_counts = {}
-
-        if subject not in learning_counts:
-            learning_counts[subject] = {}
-
-        if topic not in learning_counts[subject]:
-            learning_counts[subject][topic] = 0
-
-        learning_counts[subject][topic] += 1
-
-        with open(learning_counts_file, 'w', encoding='utf-8') as f:
-            json.dump(learning_counts, f, indent=4)
+        self.results_store.increment_learning_count("", self.selected_subject, topic)
 
 
 def main():
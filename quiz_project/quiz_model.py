@@ -0,0 +1,122 @@
+import unicodedata
+from collections.abc import Mapping
+
+
+# Keys of a question dict that are metadata and never a prompt
+METADATA_KEYS = ('question', 'type', 'image')
+
+
+def is_number_punctuation(text, index):
+    """Checks whether text[index] is the sign of a number ("-5") or a decimal point ("3.5")."""
+    if not text[index + 1:index + 2].isdigit():
+        return False
+    return text[index] == '-' or (text[index] == '.' and index > 0 and text[index - 1].isdigit())
+
+
+def normalize_answer(text):
+    """Casefolds text and strips punctuation and extra whitespace, so answers compare by content only.
+
+    The sign and decimal point of numbers are kept, so "-5" and "3.5" don't turn into "5" and "35".
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = ''.join(ch for index, ch in enumerate(text)
+                   if not unicodedata.category(ch).startswith('P') or is_number_punctuation(text, index))
+    return ' '.join(text.split())
+
+
+def split_answer(value):
+    """Splits a raw 'answer1;answer2@info' string into (answers, info)."""
+    if isinstance(value, dict):
+        value = value.get('answer', '')
+    parts = str(value).split('@')
+    answers = [ans.strip() for ans in parts[0].split(';')]
+    info = parts[1].strip() if len(parts) > 1 else ""
+    return answers, info
+
+
+class AnswerPart:
+    """One prompt of a question with its accepted answers, split and normalized once."""
+    __slots__ = ('prompt', 'answers', 'normalized', 'info')
+
+    def __init__(self, prompt, answers, normalized, info):
+        self.prompt = prompt
+        self.answers = tuple(answers)
+        self.normalized = tuple(normalized)
+        self.info = info
+
+    @classmethod
+    def from_raw(cls, prompt, value):
+        answers, info = split_answer(value)
+        return cls(prompt, answers, [normalize_answer(ans) for ans in answers], info)
+
+    @property
+    def correct_answer(self):
+        """The accepted answers as shown to the user."""
+        return "; ".join(self.answers)
+
+
+class Question:
+    """A question of a topic: optional main text, image metadata and its answer parts."""
+    __slots__ = ('text', 'type', 'image', 'parts')
+
+    def __init__(self, text, type, image, parts):
+        self.text = text
+        self.type = type
+        self.image = image
+        self.parts = tuple(parts)
+
+    @classmethod
+    def from_dict(cls, question_data):
+        """Parses a question dict as written in the lesson JSON files."""
+        parts = [AnswerPart.from_raw(key, value) for key, value in question_data.items()
+                 if key not in METADATA_KEYS and not key.startswith('_')]
+        return cls(question_data.get('question', ''), question_data.get('type'), question_data.get('image'), parts)
+
+    @classmethod
+    def from_record(cls, record):
+        """Rebuilds a question from its compact list form in the question bank."""
+        text, type, image, parts = record
+        return cls(text, type, image, [AnswerPart(*part) for part in parts])
+
+    def to_record(self):
+        """Returns the compact, JSON-serializable list form stored in the question bank."""
+        return [self.text, self.type, self.image,
+                [[part.prompt, part.answers, part.normalized, part.info] for part in self.parts]]
+
+    @property
+    def shows_image_first(self):
+        """Image questions show their image before the prompt, others after the answer."""
+        return self.type == "image" and bool(self.image)
+
+
+class Topic:
+    """A named list of questions."""
+    __slots__ = ('name', 'questions')
+
+    def __init__(self, name, questions):
+        self.name = name
+        self.questions = questions
+
+    def __len__(self):
+        return len(self.questions)
+
+
+class Lesson(Mapping):
+    """Read-only topic name -> Topic mapping of a lesson; topics are decoded on access."""
+    __slots__ = ('name', 'bank')
+
+    def __init__(self, name, bank):
+        self.name = name
+        self.bank = bank
+
+    def __getitem__(self, topic):
+        return Topic(topic, self.bank.questions(self.name, topic))
+
+    def __contains__(self, topic):
+        return topic in self.bank.topic_offsets(self.name)
+
+    def __iter__(self):
+        return iter(self.bank.topics(self.name))
+
+    def __len__(self):
+        return len(self.bank.topic_offsets(self.name))
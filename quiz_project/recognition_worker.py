@@ -0,0 +1,63 @@
+import threading
+
+import speech_recognition as sr
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from answer_timing import timed
+from speech_input import listen_for_answer
+
+
+class RecognitionWorker(QThread):
+    """Captures and transcribes one answer on a background thread.
+
+    The GUI thread only receives signals (delivered through queued connections), so the
+    window stays responsive while the microphone is open and while the recognizer and the
+    optional postprocess step (e.g. translation) talk to the network.
+    """
+    listening = pyqtSignal()
+    progress = pyqtSignal(float)  # Seconds of speech captured so far
+    partial = pyqtSignal(str)  # Interim transcript, from recognizers that stream results
+    recognized = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, source, recognizer, phrases=None, matcher=None, postprocess=None, timeout=10,
+                 phrase_time_limit=5, timer=None, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.recognizer = recognizer
+        self.phrases = phrases  # Accepted answers, used as a grammar by offline recognizers
+        self.matcher = matcher  # Ends the capture early once an interim transcript matches a phrase
+        self.postprocess = postprocess
+        self.timeout = timeout
+        self.phrase_time_limit = phrase_time_limit
+        self.timer = timer  # Optional AnswerTimer; only read by the GUI after a signal arrived
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Ends the capture early; whatever was said so far is still recognized."""
+        self._stop_event.set()
+
+    def run(self):
+        self.listening.emit()
+        try:
+            text = listen_for_answer(self.source, self.recognizer, self._stop_event, self.phrases, self.matcher,
+                                     self.timeout, self.phrase_time_limit, on_chunk=self.progress.emit,
+                                     on_partial=self.partial.emit, timer=self.timer)
+            if text is None:
+                self.failed.emit("No speech was detected. Please try speaking again.")
+                return
+
+            text = text.lower()
+            if self.postprocess is not None:
+                with timed(self.timer, "recognition"):
+                    text = self.postprocess(text)
+            self.recognized.emit(text)
+        except sr.UnknownValueError:
+            self.failed.emit("Sorry, I did not understand that. Please try again.")
+        except sr.RequestError as e:
+            self.failed.emit(f"Could not request results from the speech recognition service; {e}")
+        except OSError as e:
+            self.failed.emit(f"Could not open the microphone: {e}")
+        except Exception as e:
+            # E.g. the translator or an offline decoder failing; the GUI waits for one of the two signals
+            self.failed.emit(f"Speech recognition failed: {e}")
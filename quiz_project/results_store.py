@@ -0,0 +1,501 @@
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+from answer_timing import STAGES
+from question_bank import open_question_bank
+
+
+DEFAULT_DATABASE_NAME = "results.db"
+DEFAULT_JOURNAL_NAME = "sessions.jsonl"
+
+# Date formats written by the different quiz variants before the store existed
+LEGACY_DATE_FORMATS = ("%H:%M:%S %d-%m-%Y", "%Y-%m-%d %H:%M:%S")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    lesson TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    recorded_at TEXT,
+    date_time TEXT NOT NULL,
+    time_taken_minutes REAL NOT NULL,
+    correct_answers INTEGER NOT NULL,
+    wrong_answers INTEGER NOT NULL,
+    practice_sessions INTEGER,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_topic ON sessions (category, lesson, topic, time_taken_minutes);
+CREATE INDEX IF NOT EXISTS sessions_recorded_at ON sessions (recorded_at);
+CREATE INDEX IF NOT EXISTS sessions_source ON sessions (source);
+
+CREATE TABLE IF NOT EXISTS wrong_answers (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    question TEXT NOT NULL,
+    correct_answer TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS wrong_answers_session ON wrong_answers (session_id);
+CREATE INDEX IF NOT EXISTS wrong_answers_question ON wrong_answers (question);
+
+CREATE TABLE IF NOT EXISTS learning_counts (
+    category TEXT NOT NULL,
+    lesson TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, lesson, topic)
+);
+
+CREATE TABLE IF NOT EXISTS question_stats (
+    category TEXT NOT NULL,
+    lesson TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    question TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    misses INTEGER NOT NULL,
+    total_response_seconds REAL NOT NULL,
+    last_seen TEXT,
+    PRIMARY KEY (category, lesson, topic, question)
+);
+
+CREATE TABLE IF NOT EXISTS answer_timings (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    lesson TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    question TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    display_ns INTEGER,
+    synthesis_ns INTEGER,
+    playback_ns INTEGER,
+    input_wait_ns INTEGER,
+    recognition_ns INTEGER,
+    matching_ns INTEGER,
+    total_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answer_timings_mode ON answer_timings (mode);
+
+CREATE TABLE IF NOT EXISTS cards (
+    category TEXT NOT NULL,
+    lesson TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    question TEXT NOT NULL,
+    ease REAL NOT NULL,
+    interval_days REAL NOT NULL,
+    repetitions INTEGER NOT NULL,
+    lapses INTEGER NOT NULL,
+    due_at REAL NOT NULL,
+    reviewed_at REAL,
+    PRIMARY KEY (category, lesson, topic, question)
+);
+CREATE INDEX IF NOT EXISTS cards_due ON cards (due_at);
+
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+"""
+
+INSERT_SESSION = """
+INSERT INTO sessions (category, lesson, topic, recorded_at, date_time, time_taken_minutes,
+                      correct_answers, wrong_answers, practice_sessions, source)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_WRONG_ANSWER = "INSERT INTO wrong_answers (session_id, question, correct_answer) VALUES (?, ?, ?)"
+INCREMENT_COUNT = """
+INSERT INTO learning_counts (category, lesson, topic, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (category, lesson, topic) DO UPDATE SET count = count + excluded.count
+"""
+MERGE_COUNT = """
+INSERT INTO learning_counts (category, lesson, topic, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (category, lesson, topic) DO UPDATE SET count = MAX(count, excluded.count)
+"""
+UPDATE_QUESTION_STATS = """
+INSERT INTO question_stats (category, lesson, topic, question, attempts, misses, total_response_seconds, last_seen)
+VALUES (?, ?, ?, ?, 1, ?, ?, ?)
+ON CONFLICT (category, lesson, topic, question) DO UPDATE SET
+    attempts = attempts + 1,
+    misses = misses + excluded.misses,
+    total_response_seconds = total_response_seconds + excluded.total_response_seconds,
+    last_seen = excluded.last_seen
+"""
+INSERT_TIMINGS = (
+    "INSERT INTO answer_timings (category, lesson, topic, question, mode, recorded_at, "
+    + ", ".join(f"{stage}_ns" for stage in STAGES) + ", total_ns) VALUES ("
+    + ", ".join("?" * (len(STAGES) + 7)) + ")"
+)
+UPSERT_CARD = """
+INSERT OR REPLACE INTO cards (category, lesson, topic, question, ease, interval_days, repetitions, lapses,
+                              due_at, reviewed_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Whitelisted orderings for sessions(); the value is spliced into the query
+SESSION_ORDERS = {
+    "recorded": "id",
+    "time_taken_minutes": "time_taken_minutes, id",
+}
+
+
+def parse_legacy_date(date_time):
+    """Converts a date string written by any quiz variant into ISO format, or None."""
+    for date_format in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.strptime(date_time, date_format).isoformat()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def normalize_result(result):
+    """Maps the result dicts of the CLI and GUI variants onto the store's column names."""
+    return {
+        "date_time": result.get("date_time", ""),
+        "time_taken_minutes": result.get("time_taken_minutes", result.get("time_taken", 0)),
+        "correct_answers": result.get("correct_answers", 0),
+        "wrong_answers": result.get("wrong_answers", result.get("incorrect_answers", 0)),
+        "practice_sessions": result.get("practice_sessions"),
+        "wrong_questions_with_answers": result.get("wrong_questions_with_answers", []),
+    }
+
+
+class ResultsStore:
+    """SQLite store for quiz sessions and learning counts shared by all quiz variants.
+
+    With a journal_file, every recorded session is also appended to that JSON-lines log and
+    fsynced, so the session history can be rebuilt if the database is lost (see import_journal).
+    """
+
+    def __init__(self, database_file, journal_file=None):
+        self.database_file = database_file
+        self.journal_file = journal_file
+        self.conn = sqlite3.connect(database_file, cached_statements=64)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _insert_session(self, category, lesson, topic, result, recorded_at, source=None):
+        """Inserts one session and its wrong answers; must run inside a transaction."""
+        result = normalize_result(result)
+        cursor = self.conn.execute(INSERT_SESSION, (
+            category, lesson, topic, recorded_at, result["date_time"], result["time_taken_minutes"],
+            result["correct_answers"], result["wrong_answers"], result["practice_sessions"], source
+        ))
+        self.conn.executemany(INSERT_WRONG_ANSWER, [
+            (cursor.lastrowid, q["question"], q["correct_answer"]) for q in result["wrong_questions_with_answers"]
+        ])
+        return cursor.lastrowid
+
+    def record_session(self, category, lesson, topic, result):
+        """Records a finished quiz session; returns its id."""
+        recorded_at = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            session_id = self._insert_session(category, lesson, topic, result, recorded_at)
+        if self.journal_file:
+            entry = {"category": category, "lesson": lesson, "topic": topic, "recorded_at": recorded_at}
+            entry.update(normalize_result(result))
+            try:
+                append_journal_line(self.journal_file, entry)
+            except OSError as e:
+                print(f"Error appending to results journal {self.journal_file}: {e}")
+        return session_id
+
+    def sessions(self, category, lesson, topic, order_by="recorded"):
+        """Returns the sessions of a topic as result dicts, including wrong questions."""
+        rows = self.conn.execute(
+            "SELECT * FROM sessions WHERE category = ? AND lesson = ? AND topic = ? ORDER BY " + SESSION_ORDERS[order_by],
+            (category, lesson, topic)
+        ).fetchall()
+
+        wrong_answers = {}
+        for row in self.conn.execute(
+                "SELECT w.session_id, w.question, w.correct_answer FROM wrong_answers w "
+                "JOIN sessions s ON s.id = w.session_id WHERE s.category = ? AND s.lesson = ? AND s.topic = ?",
+                (category, lesson, topic)):
+            wrong_answers.setdefault(row["session_id"], []).append(
+                {"question": row["question"], "correct_answer": row["correct_answer"]})
+
+        return [
+            {
+                "date_time": row["date_time"],
+                "time_taken_minutes": row["time_taken_minutes"],
+                "correct_answers": row["correct_answers"],
+                "wrong_answers": row["wrong_answers"],
+                "practice_sessions": row["practice_sessions"],
+                "wrong_questions_with_answers": wrong_answers.get(row["id"], []),
+            }
+            for row in rows
+        ]
+
+    def increment_learning_count(self, category, lesson, topic):
+        """Increments the number of tests taken for a topic."""
+        with self.conn:
+            self.conn.execute(INCREMENT_COUNT, (category, lesson, topic, 1))
+
+    def learning_counts(self):
+        """Returns all learning counts as {category: {lesson: {topic: count}}}."""
+        counts = {}
+        for row in self.conn.execute("SELECT category, lesson, topic, count FROM learning_counts"):
+            counts.setdefault(row["category"], {}).setdefault(row["lesson"], {})[row["topic"]] = row["count"]
+        return counts
+
+    def record_answer(self, category, lesson, topic, question, correct, response_seconds):
+        """Adds one answer to the running statistics of a question."""
+        with self.conn:
+            self.conn.execute(UPDATE_QUESTION_STATS, (
+                category, lesson, topic, question, 0 if correct else 1, response_seconds,
+                datetime.now().isoformat(timespec='seconds')
+            ))
+
+    def question_stats(self, category, lesson, topic, question):
+        """Returns {attempts, misses, mean_response_seconds, last_seen} of a question, or None."""
+        row = self.conn.execute(
+            "SELECT * FROM question_stats WHERE category = ? AND lesson = ? AND topic = ? AND question = ?",
+            (category, lesson, topic, question)
+        ).fetchone()
+        return None if row is None else stats_from_row(row)
+
+    def weakest_questions(self, category, lesson, topic, limit=10):
+        """Returns the stats of the most often missed questions of a topic, worst miss rate first."""
+        rows = self.conn.execute(
+            "SELECT * FROM question_stats WHERE category = ? AND lesson = ? AND topic = ? AND misses > 0 "
+            "ORDER BY CAST(misses AS REAL) / attempts DESC, misses DESC, total_response_seconds / attempts DESC "
+            "LIMIT ?",
+            (category, lesson, topic, limit)
+        ).fetchall()
+        return [stats_from_row(row) for row in rows]
+
+    def record_timings(self, category, lesson, topic, question, mode, timer):
+        """Stores the stage durations of one answer measured by an AnswerTimer."""
+        with self.conn:
+            self.conn.execute(INSERT_TIMINGS, (
+                category, lesson, topic, question, mode, datetime.now().isoformat(timespec='seconds'),
+                *(timer.durations_ns.get(stage) for stage in STAGES), timer.total_ns()
+            ))
+
+    def timing_summary(self):
+        """Returns {mode: {"answers": n, stage: mean milliseconds or None, "total": ...}} over all answers."""
+        columns = [f"{stage}_ns" for stage in STAGES] + ["total_ns"]
+        summary = {}
+        for row in self.conn.execute(
+                "SELECT mode, COUNT(*) AS answers, " + ", ".join(f"AVG({column}) AS {column}" for column in columns)
+                + " FROM answer_timings GROUP BY mode"):
+            summary[row["mode"]] = {"answers": row["answers"]}
+            for stage, column in zip(STAGES + ("total",), columns):
+                summary[row["mode"]][stage] = None if row[column] is None else row[column] / 1e6
+        return summary
+
+    def cards(self, category, lesson, topic):
+        """Returns the spaced-repetition cards of a topic as rows in UPSERT_CARD column order."""
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT category, lesson, topic, question, ease, interval_days, repetitions, lapses, due_at, reviewed_at "
+            "FROM cards WHERE category = ? AND lesson = ? AND topic = ?", (category, lesson, topic))]
+
+    def save_cards(self, rows):
+        """Inserts or replaces card rows (in UPSERT_CARD column order) in one transaction."""
+        with self.conn:
+            self.conn.executemany(UPSERT_CARD, rows)
+
+    def _import_is_current(self, path, signature):
+        row = self.conn.execute("SELECT signature FROM imported_files WHERE path = ?", (path,)).fetchone()
+        return row is not None and row["signature"] == signature
+
+    def _import_results(self, source, signature, category, lesson, topic, results):
+        """Replaces the sessions previously imported from source with results."""
+        with self.conn:
+            self.conn.execute("DELETE FROM sessions WHERE source = ?", (source,))
+            for result in results:
+                self._insert_session(category, lesson, topic, result,
+                                     parse_legacy_date(result.get("date_time")), source)
+            self.conn.execute("INSERT OR REPLACE INTO imported_files (path, signature) VALUES (?, ?)",
+                              (source, signature))
+
+    def import_journal(self, journal_file):
+        """Records the sessions of a journal written by record_session, e.g. into a new database.
+
+        Sessions imported from the same journal before are replaced. Returns the number of sessions.
+        """
+        entries = read_journal_lines(journal_file)
+        with self.conn:
+            self.conn.execute("DELETE FROM sessions WHERE source = ?", (journal_file,))
+            for entry in entries:
+                self._insert_session(entry.get("category", ""), entry.get("lesson", ""), entry.get("topic", ""),
+                                     entry, entry.get("recorded_at"), journal_file)
+        return len(entries)
+
+    def _import_counts(self, counts):
+        """Merges {(category, lesson, topic): count} into learning_counts, keeping the larger value."""
+        with self.conn:
+            self.conn.executemany(MERGE_COUNT, [key + (count,) for key, count in counts.items()])
+
+    def import_json_results(self, results_directory, learning_data_file=None, lessons=()):
+        """Imports the JSON result files of every quiz variant; unchanged files are skipped.
+
+        lessons lists known lesson names, used to split "<lesson>_<topic>_results.json"
+        file names when the lesson itself contains underscores. Returns the number of
+        files imported.
+        """
+        imported = 0
+        for root, dirs, files in os.walk(results_directory):
+            relative_parts = os.path.relpath(root, results_directory).replace('\\', '/').split('/')
+
+            # CLI layout: <category>/<lesson>/<topic>/result.json
+            if len(relative_parts) == 3 and "result.json" in files:
+                path = os.path.join(root, "result.json")
+                signature = json.dumps(file_signature_or_none(path))
+                if not self._import_is_current(root, signature):
+                    category, lesson, topic = relative_parts
+                    with open(path, 'r', encoding='utf-8') as f:
+                        self._import_results(root, signature, category, lesson, topic, json.load(f))
+                    imported += 1
+
+            if root != results_directory:
+                continue
+
+            # GUI and legacy CLI layout: <lesson>_<topic>_results.json / <lesson>_<topic>_result.json
+            for file_name in files:
+                for suffix in ("_results.json", "_result.json"):
+                    if file_name.endswith(suffix):
+                        path = os.path.join(root, file_name)
+                        signature = json.dumps(file_signature_or_none(path))
+                        if not self._import_is_current(path, signature):
+                            lesson, topic = split_lesson_topic(file_name[:-len(suffix)], lessons)
+                            with open(path, 'r', encoding='utf-8') as f:
+                                self._import_results(path, signature, "", lesson, topic, json.load(f))
+                            imported += 1
+                        break
+
+            # GUI learning counts: {subject: {topic: count}}
+            learning_counts_file = os.path.join(root, "learning_counts.json")
+            if os.path.exists(learning_counts_file):
+                with open(learning_counts_file, 'r', encoding='utf-8') as f:
+                    learning_counts = json.load(f)
+                self._import_counts({("", subject, topic): count
+                                     for subject, topics in learning_counts.items()
+                                     for topic, count in topics.items()})
+
+        # CLI learning data: {category: {lesson: {topic: count}}}
+        if learning_data_file and os.path.exists(learning_data_file):
+            with open(learning_data_file, 'r', encoding='utf-8') as f:
+                learning_data = json.load(f)
+            self._import_counts({(category, lesson, topic.strip()): count
+                                 for category, category_lessons in learning_data.items()
+                                 for lesson, topics in category_lessons.items()
+                                 for topic, count in topics.items() if count})
+        return imported
+
+
+def append_journal_line(path, entry):
+    """Appends entry as one JSON line and fsyncs it; costs the same however long the journal is."""
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with open(path, 'a+b') as f:
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = "\n" + line  # Don't glue the entry onto a line cut off by a crash
+        f.write(line.encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_journal_lines(path):
+    """Parses a JSON-lines journal, skipping a torn line left behind by a crash."""
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"Skipping unreadable journal line in {path}")
+    return entries
+
+
+def file_signature_or_none(path):
+    """Returns [mtime_ns, size] of a file, or None if it doesn't exist."""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def stats_from_row(row):
+    """Converts a question_stats row into the dict returned by the store."""
+    return {
+        "question": row["question"],
+        "attempts": row["attempts"],
+        "misses": row["misses"],
+        "mean_response_seconds": row["total_response_seconds"] / row["attempts"],
+        "last_seen": row["last_seen"],
+    }
+
+
+def split_lesson_topic(name, lessons=()):
+    """Splits "<lesson>_<topic>" using the longest known lesson name as prefix."""
+    for lesson in sorted(lessons, key=len, reverse=True):
+        if name.startswith(lesson + "_"):
+            return lesson, name[len(lesson) + 1:]
+    lesson, _, topic = name.partition("_")
+    return lesson, topic
+
+
+def open_results_store(config, question_bank=None, learning_data_file="learning_data.json"):
+    """Opens the results store for a loaded config dict, importing JSON results on first use.
+
+    A new database also gets the sessions of the results journal, so deleting a lost or
+    corrupt results.db rebuilds the session history.
+    """
+    results_directory = config.get('results_directory', 'results')
+    os.makedirs(results_directory, exist_ok=True)
+    database_file = config.get('results_database') or os.path.join(results_directory, DEFAULT_DATABASE_NAME)
+    journal_file = config.get('results_journal', os.path.join(results_directory, DEFAULT_JOURNAL_NAME))
+
+    is_new = not os.path.exists(database_file)
+    store = ResultsStore(database_file, journal_file)
+    if is_new:
+        store.import_json_results(results_directory, learning_data_file, known_lessons(question_bank))
+        if journal_file:
+            store.import_journal(journal_file)
+    return store
+
+
+def known_lessons(question_bank):
+    """Returns the bare lesson names of a question bank, used to parse legacy result file names."""
+    if question_bank is None:
+        return []
+    return [lesson.split('/')[-1] for lesson in question_bank.lessons()]
+
+
+def main():
+    config_file = sys.argv[1] if len(sys.argv) > 1 else "config.json"
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+
+    question_bank = open_question_bank(config)
+    store = open_results_store(config, question_bank)
+    imported = store.import_json_results(config.get('results_directory', 'results'), "learning_data.json",
+                                         known_lessons(question_bank))
+    print(f"Imported {imported} result files into {store.database_file}")
+
+    for mode, timings in store.timing_summary().items():
+        print(f"Mean time per answer in {mode} mode ({timings.pop('answers')} answers):")
+        for stage, milliseconds in timings.items():
+            if milliseconds is not None:
+                print(f"    {stage:<12} {milliseconds:10.1f} ms")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
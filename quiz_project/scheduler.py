@@ -0,0 +1,157 @@
+import heapq
+import random
+import time
+
+
+DAY_SECONDS = 24 * 60 * 60
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+DEFAULT_NEW_CARDS_PER_SESSION = 20
+
+# SM-2 grades (0-5) given to the per-question results recorded by the quiz variants
+RESULT_QUALITY = {
+    "correct": 4,
+    "correct after practice": 2,
+    "wrong": 1,
+}
+
+
+class Card:
+    """SM-2 review state of one prompt of a topic."""
+    __slots__ = ('category', 'lesson', 'topic', 'question', 'ease', 'interval_days', 'repetitions', 'lapses',
+                 'due_at', 'reviewed_at')
+
+    def __init__(self, category, lesson, topic, question, ease=DEFAULT_EASE, interval_days=0.0, repetitions=0,
+                 lapses=0, due_at=0.0, reviewed_at=None):
+        self.category = category
+        self.lesson = lesson
+        self.topic = topic
+        self.question = question
+        self.ease = ease
+        self.interval_days = interval_days
+        self.repetitions = repetitions
+        self.lapses = lapses
+        self.due_at = due_at
+        self.reviewed_at = reviewed_at
+
+    def to_row(self):
+        """Returns the card in ResultsStore.save_cards column order."""
+        return (self.category, self.lesson, self.topic, self.question, self.ease, self.interval_days,
+                self.repetitions, self.lapses, self.due_at, self.reviewed_at)
+
+    def review(self, quality, now):
+        """Applies one SM-2 review graded 0-5 and schedules the next one."""
+        if quality >= 3:
+            if self.repetitions == 0:
+                self.interval_days = 1.0
+            elif self.repetitions == 1:
+                self.interval_days = 6.0
+            else:
+                self.interval_days = round(self.interval_days * self.ease)
+            self.repetitions += 1
+        else:
+            # Forgotten: start over with short intervals
+            self.repetitions = 0
+            self.interval_days = 1.0
+            self.lapses += 1
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        self.reviewed_at = now
+        self.due_at = now + self.interval_days * DAY_SECONDS
+
+
+class ReviewScheduler:
+    """Picks the due questions of a topic with a heap of cards ordered by due time.
+
+    Each topic's cards are read from the results store once and kept in a min-heap of
+    (due_at, prompt), so taking the next due card costs O(log n) however many cards the
+    store holds. Rescheduling a card pushes a new entry; the outdated one is recognized by
+    its due time no longer matching the card and dropped when it reaches the top.
+    """
+
+    def __init__(self, results_store, new_cards_per_session=DEFAULT_NEW_CARDS_PER_SESSION):
+        self.results_store = results_store
+        self.new_cards_per_session = new_cards_per_session
+        self._cards = {}  # (category, lesson, topic) -> {prompt: Card}
+        self._heaps = {}  # (category, lesson, topic) -> [(due_at, prompt)]
+
+    def _load(self, topic_key):
+        if topic_key not in self._cards:
+            cards = {row[3]: Card(*row) for row in self.results_store.cards(*topic_key)}
+            heap = [(card.due_at, prompt) for prompt, card in cards.items()]
+            heapq.heapify(heap)
+            self._cards[topic_key] = cards
+            self._heaps[topic_key] = heap
+        return self._cards[topic_key], self._heaps[topic_key]
+
+    def pop_due(self, category, lesson, topic, now=None):
+        """Removes and returns the most overdue card of a topic, or None if nothing is due."""
+        now = time.time() if now is None else now
+        cards, heap = self._load((category, lesson, topic))
+        while heap and heap[0][0] <= now:
+            due_at, prompt = heapq.heappop(heap)
+            card = cards.get(prompt)
+            if card is not None and card.due_at == due_at:
+                return card
+        return None
+
+    def next_due(self, category, lesson, topic):
+        """Returns the due time of the next card of a topic, or None if it has no cards."""
+        cards, heap = self._load((category, lesson, topic))
+        while heap and cards[heap[0][1]].due_at != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def session(self, category, lesson, topic, questions, now=None):
+        """Returns the questions to ask now: the ones with a due prompt, most overdue first,
+        followed by up to new_cards_per_session questions that were never reviewed."""
+        now = time.time() if now is None else now
+        cards, heap = self._load((category, lesson, topic))
+
+        due = []
+        while True:
+            card = self.pop_due(category, lesson, topic, now)
+            if card is None:
+                break
+            due.append(card)
+        for card in due:
+            # Still due until it is reviewed
+            heapq.heappush(heap, (card.due_at, card.question))
+
+        due_order = {card.question: index for index, card in enumerate(due)}
+        due_questions = []
+        new_questions = []
+        for question in questions:
+            indices = [due_order[part.prompt] for part in question.parts if part.prompt in due_order]
+            if indices:
+                due_questions.append((min(indices), question))
+            elif any(part.prompt not in cards for part in question.parts):
+                new_questions.append(question)
+
+        due_questions.sort(key=lambda item: item[0])
+        random.shuffle(new_questions)
+        return [question for _, question in due_questions] + new_questions[:self.new_cards_per_session]
+
+    def record_session(self, category, lesson, topic, results, now=None):
+        """Reschedules every prompt answered in a session and saves the cards in one transaction.
+
+        results are the per-prompt dicts collected by the quiz ({"question": prompt, "result": ...}).
+        """
+        now = time.time() if now is None else now
+        cards, heap = self._load((category, lesson, topic))
+        reviewed = []
+        for result in results:
+            prompt = result["question"]
+            card = cards.get(prompt)
+            if card is None:
+                card = cards[prompt] = Card(category, lesson, topic, prompt)
+            card.review(RESULT_QUALITY.get(result["result"], 0), now)
+            heapq.heappush(heap, (card.due_at, prompt))
+            reviewed.append(card)
+        self.results_store.save_cards([card.to_row() for card in reviewed])
+
+
+def open_review_scheduler(config, results_store):
+    """Creates the review scheduler for a loaded config dict, or None if spaced repetition is off."""
+    if not config.get('spaced_repetition', True):
+        return None
+    return ReviewScheduler(results_store, config.get('new_cards_per_session', DEFAULT_NEW_CARDS_PER_SESSION))
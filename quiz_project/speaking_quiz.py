@@ -2,6 +2,7 @@ import sys
 import json
 import os
 import random
+import threading
 import time
 from datetime import datetime
 from collections import defaultdict
@@ -10,24 +11,53 @@ from PyQt5.QtWidgets import (
     QMessageBox, QHBoxLayout, QScrollArea
 )
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, pyqtSignal
 from tabulate import tabulate
-from rapidfuzz import fuzz
-from gtts import gTTS
-import speech_recognition as sr
-from playsound import playsound
+from answer_matcher import AnswerMatcher
+from answer_timing import AnswerTimer
+from learn_view import LearnView
+from question_bank import open_question_bank
+from results_store import open_results_store
+from tts_cache import open_audio_cache
+from tts_engines import create_tts_engine
+from tts_prefetch import SpeechPrefetcher
+from audio_player import AudioPlayer
+from speech_input import MicrophoneSource, create_recognizer
+from quiz_model import normalize_answer
+from recognition_worker import RecognitionWorker
+from translation_cache import open_translation_cache
 from googletrans import Translator
 
 class QuizMaster(QWidget):
+    speech_ready = pyqtSignal(object)  # Future of a spoken clip, emitted from synthesis threads
+
     def __init__(self):
         super().__init__()
         self.config = self.load_config("config.json")
         self.results_directory = self.config.get('results_directory', 'results')
+        self.question_bank = open_question_bank(self.config)
+        self.results_store = open_results_store(self.config, self.question_bank)
+        self.answer_matcher = AnswerMatcher(self.config['fuzzy_search_threshold'])
+        self.tts_engine = create_tts_engine(self.config.get('tts_engine', 'gtts'))
+        self.audio_cache = open_audio_cache(self.config, self.tts_engine.extension)
+        self.audio_player = AudioPlayer()
+        # Clips that are not cached yet are synthesized in the background, never on the GUI thread
+        self.speech_prefetcher = SpeechPrefetcher(self.audio_cache, self.tts_engine, on_ready=self.audio_player.preload)
+        self.speech_ready.connect(self.on_speech_ready)
+        self.pending_speech = None  # Future of the clip to play next
+        self.speech_timer = None
         self.initUI()
         self.load_subjects()
         self.is_listening = False
         self.user_answer = None
+        self.practice_attempts_left = 0
         self.translator = Translator()  # Initialize the translator
+        self.translation_cache = open_translation_cache(self.config, self.translator)
+        # Swap in speech_input.FakeAudioSource / TranscriptRecognizer to run without a microphone
+        self.speech_source = MicrophoneSource()
+        self.speech_recognizer = create_recognizer(self.config, language="en-IN")
+        # Stricter than answer checking: only a confident interim match ends the recording early
+        self.endpoint_matcher = AnswerMatcher(self.config.get('early_endpoint_score', 90))
 
     def initUI(self):
         self.setWindowTitle('Quiz Master')
@@ -110,32 +140,20 @@ class QuizMaster(QWidget):
 
     def load_topics(self):
         selected_subject = self.subject_dropdown.currentText()
-        learning_section_directory = self.config['learning_section_directory']
-        data_file_path = os.path.join(learning_section_directory, selected_subject + '.json')
-        with open(data_file_path, 'r') as f:
-            self.data = json.load(f)
+        self.data = self.question_bank.lesson(selected_subject)
         topics = list(self.data.keys())
         self.topic_dropdown.clear()
         self.topic_dropdown.addItems(topics)
 
     def show_learning_overview(self):
-        learning_counts_file = os.path.join(self.results_directory, "learning_counts.json")
-
-        if os.path.exists(learning_counts_file):
-            with open(learning_counts_file, 'r', encoding='utf-8') as f:
-                learning_counts = json.load(f)
-        else:
-            learning_counts = {}
+        learning_counts = self.results_store.learning_counts().get("", {})
 
         # Load all topics from the learning section
         all_topics = defaultdict(list)
-        learning_section_directory = self.config['learning_section_directory']
-        for file_name in os.listdir(learning_section_directory):
-            if file_name.endswith('.json'):
-                subject = file_name.replace('.json', '')
-                with open(os.path.join(learning_section_directory, file_name), 'r') as f:
-                    data = json.load(f)
-                    all_topics[subject].extend(data.keys())
+        self.question_bank.refresh()
+        for subject in self.question_bank.lessons():
+            if '/' not in subject:
+                all_topics[subject].extend(self.question_bank.topics(subject))
 
         # Build the overview message
         overview_message = ""
@@ -168,14 +186,21 @@ class QuizMaster(QWidget):
         self.selected_subject = self.subject_dropdown.currentText()
         self.selected_topic = self.topic_dropdown.currentText()
 
-        self.questions = self.data[self.selected_topic]
+        self.questions = self.data[self.selected_topic].questions
         random.shuffle(self.questions)  # Shuffle questions for unbiased learning
         self.current_question_index = 0
 
         self.correct_answers = 0
         self.incorrect_answers = 0
+        self.practice_attempts_left = 0
         self.start_time = time.time()
 
+        if self.mode == "speaking" and not self.speech_recognizer.uses_grammar:
+            # Translate the topic's answers in one request in the background, so saying one of
+            # them later is answered from the translation cache
+            answers = [answer for question in self.questions for part in question.parts for answer in part.answers]
+            threading.Thread(target=self.translation_cache.pretranslate, args=(answers,), daemon=True).start()
+
         self.display_question()
 
     def display_question(self):
@@ -186,35 +211,47 @@ class QuizMaster(QWidget):
 
     def display_all_content(self):
         self.clear_content()
-        serial_number = 1
-        for question_data in self.questions:
-            question_label = QLabel(f"{serial_number}. {question_data.get('question', '')}")
-            question_label.setFont(self.question_font)
-            self.content_layout.addWidget(question_label)
-
-            for key, value in question_data.items():
-                if key not in ['question']:
-                    answer_label = QLabel(f"{key}: {value.split('@')[0]}")
-                    self.content_layout.addWidget(answer_label)
-                    if '@' in value:
-                        info_label = QLabel(f"   Info: {value.split('@')[1]}")
-                        self.content_layout.addWidget(info_label)
-
-            serial_number += 1
+        # Only the rows in view are laid out and painted, so huge topics open at once
+        self.content_layout.addWidget(LearnView(self.questions, self.question_font))
 
     def display_test_content(self):
         self.clear_content()
-        self.current_question_data = self.questions[self.current_question_index]
+        self.current_question = self.questions[self.current_question_index]
+        # Parts still to be answered, pre-split and pre-normalized when the lesson was compiled
+        self.remaining_parts = list(self.current_question.parts)
         self.current_answer_list = None
+        self.display_next_part_of_question()
+        if self.mode == "speaking":
+            self.prefetch_question_speech()  # Queued after the prompt that is spoken now
+
+    def display_next_part_of_question(self):
+        self.answer_timer = AnswerTimer()
+        self.clear_content()
+
+        if not self.current_answer_list:
+            if not self.remaining_parts:
+                self.current_question_index += 1
+                if self.current_question_index < len(self.questions):
+                    self.display_test_content()
+                else:
+                    self.end_quiz()
+                return
+
+            # Get the next part of the question
+            part = self.remaining_parts.pop(0)
+            self.current_question_part_key = part.prompt
+            self.current_answer_list = list(part.answers)
+            self.current_normalized_answers = list(part.normalized)
 
         # Display the question as text and also speak it
-        main_question = self.current_question_data.get('question', '')
-        question_label = QLabel(main_question)
+        main_question = self.current_question.text
+        question_label = QLabel(f"{main_question}\n{self.current_question_part_key}".strip())
         question_label.setFont(self.question_font)
         self.content_layout.addWidget(question_label)
+        self.answer_timer.lap("display")
 
         if self.mode == "speaking":
-            self.speak_text(main_question)
+            self.speak_text(self.current_question_part_key, self.answer_timer)
             self.toggle_button.setEnabled(True)  # Enable the button after the question is spoken
 
     def toggle_listening(self):
@@ -228,49 +265,71 @@ class QuizMaster(QWidget):
             return
 
         self.is_listening = True
+        self.pending_speech = None  # A prompt that is still being synthesized isn't played anymore
+        self.audio_player.barge_in()  # Don't talk over the user or record our own prompt
         self.toggle_button.setText("Stop Listening")
         self.display_listening_status("Listening...")
 
-        # Start listening
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.listen_for_answer)
-        self.timer.start(1000)  # Check every second if the user has finished speaking
+        # Capture and recognition run on a worker thread; the GUI only reacts to its signals
+        if self.practice_attempts_left:
+            phrases = [normalize_answer(answer) for answer in self.practice_answer.split(';')]
+            timer = None
+        else:
+            phrases = self.current_normalized_answers
+            timer = self.answer_timer
+            timer.lap("input_wait")  # Until the user started speaking
+        # Grammar-constrained recognizers already answer in the lesson's words, no translation needed
+        postprocess = None if self.speech_recognizer.uses_grammar else self.translate_answer
+        self.recognition_worker = RecognitionWorker(self.speech_source, self.speech_recognizer, phrases=phrases,
+                                                    matcher=self.endpoint_matcher, postprocess=postprocess,
+                                                    timer=timer, parent=self)
+        self.recognition_worker.partial.connect(self.display_partial_answer)
+        self.recognition_worker.recognized.connect(self.on_answer_recognized)
+        self.recognition_worker.failed.connect(self.on_recognition_failed)
+        self.recognition_worker.finished.connect(self.recognition_worker.deleteLater)
+        self.recognition_worker.start()
 
     def stop_listening(self):
         if not self.is_listening:
             return
 
+        # End the recording early; the answer still arrives through on_answer_recognized
+        self.toggle_button.setText("Recognizing...")
+        self.toggle_button.setEnabled(False)
+        self.recognition_worker.stop()
+
+    def finish_listening(self):
         self.is_listening = False
         self.toggle_button.setText("Start Listening")
-        self.timer.stop()
-        self.process_answer(self.user_answer)
-
-    def listen_for_answer(self):
-        recognizer = sr.Recognizer()
-        with sr.Microphone() as source:
-            print("liesting")
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio = recognizer.listen(source, timeout=10, phrase_time_limit=5)
-
-        try:
-            # Recognize the speech
-            text = recognizer.recognize_google(audio, language="en-IN").lower()
-            print(f"Recognized text: {text}")
-
-            # Translate the recognized text
-            translated_text = self.translator.translate(text, dest='en')  # Change 'en' to the desired target language code
-            print(f"Translated text: {translated_text.text}")
-
-            self.user_answer = translated_text.text  # Use the translated text for further processing
-
-        except sr.UnknownValueError:
-            QMessageBox.warning(self, "Could Not Understand", "Sorry, I did not understand that. Please try again.")
-            self.user_answer = None
-        except sr.RequestError as e:
-            QMessageBox.warning(self, "API Error", f"Could not request results from Google Speech Recognition service; {e}")
-            self.user_answer = None
+        self.toggle_button.setEnabled(True)
+
+    def translate_answer(self, text):
+        """Translates the recognized answer to English; runs on the recognition thread."""
+        print(f"Recognized text: {text}")
+        translated_text = self.translation_cache.translate(text)  # Only calls the translator for new phrases
+        print(f"Translated text: {translated_text}")
+        return translated_text
+
+    def display_partial_answer(self, text):
+        self.display_listening_status(f"Listening... {text}")
+
+    def on_answer_recognized(self, text):
+        self.finish_listening()
+        self.user_answer = text
+        if self.practice_attempts_left:
+            self.check_practice_answer(text)
+        else:
+            self.process_answer(text)
 
-        self.stop_listening()
+    def on_recognition_failed(self, message):
+        self.finish_listening()
+        self.user_answer = None
+        QMessageBox.warning(self, "Could Not Understand", message)
+        # Ask the same question again
+        if self.practice_attempts_left:
+            self.ask_practice_attempt()
+        else:
+            self.display_next_part_of_question()
 
     def process_answer(self, user_answer):
         # Check if the answer is None, meaning no valid input was captured
@@ -283,25 +342,23 @@ class QuizMaster(QWidget):
             QMessageBox.warning(self, "Error", "Answer list is not initialized. Please check the question setup.")
             return
 
-        matched = any(
-            fuzz.ratio(user_answer, ans) >= self.config['fuzzy_search_threshold'] for ans in self.current_answer_list
-        )
-
-        if matched:
-            matched_answer = next(ans for ans in self.current_answer_list if
-                                  fuzz.ratio(user_answer, ans) >= self.config['fuzzy_search_threshold'])
-            self.current_answer_list.remove(matched_answer)
+        # One scoring pass over all remaining (pre-normalized) answers, keeping the best match
+        with self.answer_timer.stage("matching"):
+            match = self.answer_matcher.best_match(user_answer, self.current_normalized_answers)
+        self.results_store.record_answer("", self.selected_subject, self.selected_topic, self.current_question_part_key,
+                                         bool(match), self.answer_timer.total_ns() / 1e9)
+        self.results_store.record_timings("", self.selected_subject, self.selected_topic,
+                                          self.current_question_part_key, "speak", self.answer_timer)
+
+        if match:
+            index, score = match
+            matched_answer = self.current_answer_list.pop(index)
+            del self.current_normalized_answers[index]
             QMessageBox.information(self, "Correct", f"'{matched_answer}' is correct!")
             self.correct_answers += 1
 
-            if not self.current_answer_list:
-                self.current_question_data[self.current_question_part_key] = ""  # Mark this part as answered
-
-                # Move to the next part of the question or to the next question
-                self.display_next_part_of_question()
-            else:
-                # Still more answers remaining for this question part
-                self.display_next_part_of_question()
+            # Ask for the remaining answers of this part, or move to the next part or question
+            self.display_next_part_of_question()
         else:
             correct_answer = "; ".join(self.current_answer_list)
             QMessageBox.warning(self, "Incorrect", f"Incorrect. The correct answer is: {correct_answer}")
@@ -309,17 +366,28 @@ class QuizMaster(QWidget):
             self.practice_wrong_answer(correct_answer, self.current_question_part_key)
 
     def practice_wrong_answer(self, correct_answer, key):
-        for attempt in range(self.config['practice_attempts']):
-            self.speak_text(f"Practice: {key}")
-            user_answer = self.listen_for_answer()
-            if user_answer and fuzz.ratio(user_answer.strip().lower(), correct_answer.lower()) >= self.config[
-                'fuzzy_search_threshold']:
-                QMessageBox.information(self, "Correct", "Correct!")
-                break
-            else:
-                QMessageBox.warning(self, "Incorrect",
-                                    f"Incorrect. The correct answer is: {correct_answer}. Please try again.")
-        self.display_next_part_of_question()
+        self.practice_answer = correct_answer
+        self.practice_key = key
+        self.practice_attempts_left = self.config['practice_attempts']
+        self.ask_practice_attempt()
+
+    def ask_practice_attempt(self):
+        self.display_listening_status(f"Practice: {self.practice_key}")
+        self.speak_text(f"Practice: {self.practice_key}")
+
+    def check_practice_answer(self, user_answer):
+        if user_answer and self.answer_matcher.is_match(user_answer.strip().lower(), self.practice_answer.lower()):
+            QMessageBox.information(self, "Correct", "Correct!")
+            self.practice_attempts_left = 0
+        else:
+            QMessageBox.warning(self, "Incorrect",
+                                f"Incorrect. The correct answer is: {self.practice_answer}. Please try again.")
+            self.practice_attempts_left -= 1
+
+        if self.practice_attempts_left:
+            self.ask_practice_attempt()
+        else:
+            self.display_next_part_of_question()
 
     def clear_content(self):
         for i in reversed(range(self.content_layout.count())):
@@ -333,61 +401,52 @@ class QuizMaster(QWidget):
         result_data = {
             "date_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "correct_answers": self.correct_answers,
-            "incorrect_answers": self.incorrect_answers,
-            "time_taken": time_taken
+            "wrong_answers": self.incorrect_answers,
+            "time_taken_minutes": time_taken
         }
 
-        result_file_name = f"{self.selected_subject}_{self.selected_topic}_results.json"
-        result_file_path = os.path.join(self.results_directory, result_file_name)
-
-        if os.path.exists(result_file_path):
-            with open(result_file_path, 'r') as f:
-                results = json.load(f)
-        else:
-            results = []
-
-        results.append(result_data)
-
-        with open(result_file_path, 'w') as f:
-            json.dump(results, f, indent=4)
+        # GUI lessons live directly in the learning section, so they have no category
+        self.results_store.record_session("", self.selected_subject, self.selected_topic, result_data)
 
-        self.display_results(results)
-        self.update_learning_count(self.selected_subject, self.selected_topic)
+        self.display_results(self.results_store.sessions("", self.selected_subject, self.selected_topic))
+        self.results_store.increment_learning_count("", self.selected_subject, self.selected_topic)
 
     def display_results(self, results):
         headers = ["Date Time", "Correct Answers", "Incorrect Answers", "Time Taken (minutes)"]
-        table_data = [[r["date_time"], r["correct_answers"], r["incorrect_answers"], r["time_taken"]] for r in results]
+        table_data = [[r["date_time"], r["correct_answers"], r["wrong_answers"], r["time_taken_minutes"]] for r in results]
 
         results_table = tabulate(table_data, headers, tablefmt="grid")
         QMessageBox.information(self, "Quiz Results", results_table)
 
-    def update_learning_count(self, subject, topic):
-        learning_counts_file = os.path.join(self.config['results_directory'], "learning_counts.json")
-
-        os.makedirs(self.config['results_directory'], exist_ok=True)
-
-        if os.path.exists(learning_counts_file):
-            with open(learning_counts_file, 'r', encoding='utf-8') as f:
-                learning_counts = json.load(f)
-        else:
-            learning_counts = {}
-
-        if subject not in learning_counts:
-            learning_counts[subject] = {}
-
-        if topic not in learning_counts[subject]:
-            learning_counts[subject][topic] = 0
-
-        learning_counts[subject][topic] += 1
+    def speak_text(self, text, timer=None):
+        """Plays the clip of text once it is available; returns right away, even on a cache miss."""
+        future = self.speech_prefetcher.clip_async(text, 'hi')
+        self.pending_speech = future
+        self.speech_timer = timer
+        future.add_done_callback(self.speech_ready.emit)
+
+    def on_speech_ready(self, future):
+        if future is not self.pending_speech:
+            return  # Superseded by a newer prompt, or the user already started answering
+        self.pending_speech = None
+        if self.speech_timer is not None:
+            self.speech_timer.lap("synthesis")
+        try:
+            audio_file = future.result()
+        except Exception as e:
+            print(f"Error synthesizing speech: {e}")
+            return
+        self.audio_player.play(audio_file)  # Plays in the background, the GUI stays responsive
 
-        with open(learning_counts_file, 'w', encoding='utf-8') as f:
-            json.dump(learning_counts, f, indent=4)
+    def prefetch_question_speech(self):
+        """Synthesizes the prompts of the next questions while the current one is answered."""
+        upcoming = self.questions[self.current_question_index + 1:
+                                  self.current_question_index + 1 + self.config.get('speech_prefetch_questions', 3)]
+        self.speech_prefetcher.prefetch([part.prompt for question in upcoming for part in question.parts], 'hi')
 
-    def speak_text(self, text):
-        tts = gTTS(text=text, lang='hi')
-        tts.save("question.mp3")
-        playsound("question.mp3")
-        os.remove("question.mp3")
+    def closeEvent(self, event):
+        self.translation_cache.save()  # Translations of the last answers may not be written yet
+        super().closeEvent(event)
 
     def display_listening_status(self, status):
         self.clear_content()
@@ -0,0 +1,496 @@
+import array
+import collections
+import json
+import math
+import queue
+import re
+import threading
+import time
+
+import speech_recognition as sr
+
+from answer_timing import timed
+
+
+def chunk_rms(chunk, sample_width=2):
+    """Returns the RMS energy of a chunk of 16-bit PCM audio."""
+    if sample_width != 2 or not chunk:
+        return 0
+    samples = array.array('h', chunk[:len(chunk) - len(chunk) % 2])
+    if not samples:
+        return 0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+
+class MicrophoneSource:
+    """Long-lived microphone session that captures one utterance per capture() call.
+
+    The microphone is opened and calibrated once, on the first capture, and a reader thread
+    keeps the stream drained between answers: quiet chunks keep adapting the energy threshold
+    to the room and the last pre_roll_seconds are kept, so a capture starts instantly and
+    doesn't cut off the first syllable. Speech starts once a chunk is louder than the
+    threshold and ends after pause_seconds of silence, after phrase_time_limit or as soon as
+    stop_event is set (e.g. the user pressed "Stop Listening").
+    """
+
+    def __init__(self, recognizer=None, sample_rate=16000, calibration_seconds=1.0,
+                 pause_seconds=0.8, pre_roll_seconds=0.3, adaptive=True):
+        self.recognizer = recognizer or sr.Recognizer()
+        self.sample_rate = sample_rate
+        self.calibration_seconds = calibration_seconds
+        self.pause_seconds = pause_seconds
+        self.pre_roll_seconds = pre_roll_seconds
+        self.adaptive = adaptive
+        self._microphone = None
+        self._source = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._capturing = False
+        self._chunks = queue.Queue()  # Chunks read while a capture is running
+        self._pre_roll = None
+
+    def open(self):
+        """Opens the microphone stream and calibrates the energy threshold, once per session."""
+        if self._reader is not None and self._reader.is_alive():
+            return
+        self.close()  # The reader may have died with the device, start over
+        self._microphone = sr.Microphone(sample_rate=self.sample_rate)
+        self._source = self._microphone.__enter__()
+        self.recognizer.adjust_for_ambient_noise(self._source, duration=self.calibration_seconds)
+        seconds_per_chunk = self._source.CHUNK / self._source.SAMPLE_RATE
+        self._pre_roll = collections.deque(maxlen=max(1, int(self.pre_roll_seconds / seconds_per_chunk)))
+        self._closed.clear()
+        self._reader = threading.Thread(target=self._read_loop, name="microphone-reader", daemon=True)
+        self._reader.start()
+
+    def close(self):
+        """Stops the reader thread and releases the microphone."""
+        if self._reader is None:
+            return
+        self._closed.set()
+        self._reader.join()
+        self._reader = None
+        self._microphone.__exit__(None, None, None)
+        self._microphone = self._source = None
+
+    def _read_loop(self):
+        source = self._source
+        seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+        while not self._closed.is_set():
+            try:
+                chunk = source.stream.read(source.CHUNK)
+            except OSError as e:
+                print(f"Error reading from the microphone: {e}")
+                return
+            with self._lock:
+                if self._capturing:
+                    self._chunks.put(chunk)
+                    continue
+                self._pre_roll.append(chunk)
+            if self.adaptive:
+                self._adapt_threshold(chunk_rms(chunk, source.SAMPLE_WIDTH), seconds_per_chunk)
+
+    def _adapt_threshold(self, energy, seconds_per_chunk):
+        """Tracks the room's noise floor the same way the recognizer's dynamic threshold does.
+
+        Chunks above the threshold (speech, or our own TTS prompt) are not noise and are ignored.
+        """
+        recognizer = self.recognizer
+        if energy >= recognizer.energy_threshold:
+            return
+        damping = recognizer.dynamic_energy_adjustment_damping ** seconds_per_chunk
+        target = energy * recognizer.dynamic_energy_ratio
+        recognizer.energy_threshold = max(recognizer.energy_threshold * damping + target * (1 - damping), 1)
+
+    def capture(self, stop_event, timeout=10, phrase_time_limit=5, on_chunk=None, keep_pre_roll=True,
+                on_frame=None):
+        """Returns the captured utterance as sr.AudioData, or None if nothing was said.
+
+        Pass keep_pre_roll=False to drop audio from before the call, e.g. a beep that was just played.
+        on_frame(chunk) receives the raw audio of the utterance as it is captured; returning
+        True ends the utterance right away (early endpointing).
+        """
+        self.open()
+        with self._lock:
+            self._chunks = queue.Queue()
+            pre_roll = list(self._pre_roll) if keep_pre_roll else []
+            self._pre_roll.clear()
+            self._capturing = True
+        try:
+            return self._capture_from(self._source, self._next_chunk, pre_roll,
+                                      stop_event, timeout, phrase_time_limit, on_chunk, on_frame)
+        finally:
+            with self._lock:
+                self._capturing = False
+
+    def _next_chunk(self, stop_event):
+        """Waits for the reader thread's next chunk; returns None once stop_event is set."""
+        while not stop_event.is_set():
+            try:
+                return self._chunks.get(timeout=0.1)
+            except queue.Empty:
+                if not self._reader.is_alive():
+                    raise OSError("The microphone stream was closed")
+        return None
+
+    def _capture_from(self, source, next_chunk, pre_roll_chunks, stop_event, timeout, phrase_time_limit, on_chunk,
+                      on_frame=None):
+        seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+        # Keep a little audio from before the first loud chunk so the first syllable isn't cut off
+        pre_roll = collections.deque(pre_roll_chunks, maxlen=max(1, int(self.pre_roll_seconds / seconds_per_chunk)))
+        frames = []
+        waited = silence = 0.0
+
+        while True:
+            chunk = next_chunk(stop_event)
+            if chunk is None:
+                break
+            loud = chunk_rms(chunk, source.SAMPLE_WIDTH) > self.recognizer.energy_threshold
+            if not frames:
+                pre_roll.append(chunk)
+                if loud:
+                    frames.extend(pre_roll)
+                    new_frames = list(pre_roll)
+                else:
+                    waited += seconds_per_chunk
+                    if timeout and waited >= timeout:
+                        return None
+                    continue
+            else:
+                frames.append(chunk)
+                new_frames = [chunk]
+                silence = 0.0 if loud else silence + seconds_per_chunk
+
+            if on_frame is not None and any([on_frame(frame) for frame in new_frames]):
+                break
+            if on_chunk is not None:
+                on_chunk(len(frames) * seconds_per_chunk)
+            if silence >= self.pause_seconds:
+                break
+            if phrase_time_limit and len(frames) * seconds_per_chunk >= phrase_time_limit:
+                break
+
+        if not frames:
+            return None
+        return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+
+class FakeAudioSource:
+    """Stands in for the microphone by handing out prepared utterances in order.
+
+    An utterance may be sr.AudioData for a real recognizer or plain text for
+    TranscriptRecognizer; None simulates silence.
+    """
+
+    def __init__(self, utterances, delay=0.0):
+        self.utterances = collections.deque(utterances)
+        self.delay = delay
+
+    def capture(self, stop_event, timeout=10, phrase_time_limit=5, on_chunk=None, keep_pre_roll=True,
+                on_frame=None):
+        """Returns the next utterance; text utterances are also streamed word by word to on_frame."""
+        stop_event.wait(self.delay)
+        if not self.utterances:
+            return None
+        utterance = self.utterances.popleft()
+        if on_frame is not None and isinstance(utterance, str):
+            for word in utterance.split():
+                if on_frame(word):
+                    break
+        return utterance
+
+
+ONES = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "eleven", "twelve",
+        "thirteen", "fourteen", "fifteen", "sixteen", "seventeen", "eighteen", "nineteen"]
+TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+SCALES = [(10 ** 9, "billion"), (10 ** 6, "million"), (1000, "thousand")]
+
+
+def number_words(number, conjunction=False):
+    """Spells a non-negative integer in English words, e.g. 105 -> "one hundred five" ("one hundred and five")."""
+    if number < 20:
+        return ONES[number]
+    if number < 100:
+        tens, ones = divmod(number, 10)
+        return TENS[tens] + (" " + ONES[ones] if ones else "")
+    if number < 1000:
+        hundreds, rest = divmod(number, 100)
+        words = ONES[hundreds] + " hundred"
+        if rest:
+            words += (" and " if conjunction else " ") + number_words(rest, conjunction)
+        return words
+    for scale, name in SCALES:
+        if number >= scale:
+            high, rest = divmod(number, scale)
+            words = number_words(high, conjunction) + " " + name
+            if rest:
+                words += (" and " if conjunction and rest < 100 else " ") + number_words(rest, conjunction)
+            return words
+
+
+def spoken_forms(phrase):
+    """Returns the ways a normalized answer is said, with its numbers spelled out ("5 apples" -> "five apples").
+
+    Speech decoders only produce words, so an answer with digits has to be put into their
+    grammar in its spoken form; numbers of 100 and more are said with and without "and".
+    """
+    tokens = phrase.split()
+    if not any(token.isdigit() and len(token) <= 12 for token in tokens):
+        return [phrase]
+    forms = []
+    for conjunction in (False, True):
+        form = " ".join(number_words(int(token), conjunction) if token.isdigit() and len(token) <= 12 else token
+                        for token in tokens)
+        if form not in forms:
+            forms.append(form)
+    return forms
+
+
+class SpokenAnswers:
+    """Maps the spoken forms of a question's accepted answers back to the answers themselves.
+
+    Decoders are given the spoken forms (see spoken_forms); restore() turns them back into the
+    accepted answers in a transcript, so "five" is matched against the answer "5".
+    """
+
+    def __init__(self, phrases=None):
+        self.vocabulary = []  # Every spoken form, for a grammar or keyword list
+        self._answers = {}  # Spoken form -> accepted answer, only for answers containing numbers
+        for phrase in phrases or ():
+            if not phrase:
+                continue
+            for form in spoken_forms(phrase):
+                if form not in self.vocabulary:
+                    self.vocabulary.append(form)
+                if form != phrase:
+                    self._answers.setdefault(form, phrase)
+        self._pattern = None
+        if self._answers:
+            # Longest first, so "twenty five" is replaced before "five"
+            alternatives = sorted(self._answers, key=len, reverse=True)
+            self._pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, alternatives)) + r")\b", re.IGNORECASE)
+
+    def restore(self, text):
+        if self._pattern is None or not text:
+            return text
+        return self._pattern.sub(lambda match: self._answers[match.group(0).lower()], text)
+
+
+def clean_transcript(text):
+    """Drops the unknown-word token a grammar-constrained decoder emits for out-of-grammar speech."""
+    return " ".join(word for word in text.split() if word != "[unk]")
+
+
+class GoogleRecognizer:
+    """Transcribes captured audio with the Google Web Speech API (needs network access).
+
+    The API only transcribes a finished utterance, so answers recognized with it don't end
+    early on a confident match (see listen_for_answer).
+
+    Recognizers share recognize(audio, on_partial=None, phrases=None); phrases are the
+    normalized answers the current question accepts, which offline engines use as a grammar.
+    """
+    uses_grammar = False
+
+    def __init__(self, language="en-IN", recognizer=None):
+        self.language = language
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def recognize(self, audio, on_partial=None, phrases=None):
+        # The web API only returns final results and takes no grammar; numbers said as words still match
+        return SpokenAnswers(phrases).restore(self.recognizer.recognize_google(audio, language=self.language))
+
+
+class VoskRecognizer:
+    """Offline recognition with a local Vosk model, restricted to the accepted answers.
+
+    With phrases given, the decoder only considers the words of those answers (plus an
+    "unknown" token for anything else), which makes short answers both faster to decode and
+    far less likely to be misheard than free dictation.
+    """
+    uses_grammar = True
+    sample_rate = 16000
+
+    def __init__(self, model_path, recognizer=None):
+        import vosk  # Optional dependency, only needed for this backend
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def create_decoder(self, spoken_answers, sample_rate=None):
+        sample_rate = sample_rate or self.sample_rate
+        if spoken_answers.vocabulary:
+            grammar = sorted(spoken_answers.vocabulary) + ["[unk]"]
+            return self.vosk.KaldiRecognizer(self.model, sample_rate, json.dumps(grammar))
+        return self.vosk.KaldiRecognizer(self.model, sample_rate)
+
+    def start_stream(self, phrases=None, sample_rate=None):
+        """Returns a VoskStream that decodes 16-bit audio while it is being captured."""
+        spoken_answers = SpokenAnswers(phrases)
+        return VoskStream(self.create_decoder(spoken_answers, sample_rate), spoken_answers)
+
+    def recognize(self, audio, on_partial=None, phrases=None):
+        stream = self.start_stream(phrases)
+        data = audio.get_raw_data(convert_rate=self.sample_rate, convert_width=2)
+        step = self.sample_rate // 4 * 2  # A quarter of a second of 16-bit samples
+        for start in range(0, len(data), step):
+            partial = stream.feed(data[start:start + step])
+            if partial and on_partial is not None:
+                on_partial(partial)
+        text = stream.finish()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class VoskStream:
+    """Incremental decoding of one utterance: feed() raw chunks as they arrive, then finish().
+
+    Transcripts are returned with spelled-out numbers turned back into the accepted answers.
+    """
+
+    def __init__(self, decoder, spoken_answers=None):
+        self.decoder = decoder
+        self.spoken_answers = spoken_answers or SpokenAnswers()
+        self.text = ""  # Best transcript so far
+
+    def feed(self, chunk):
+        """Decodes a chunk of 16-bit audio and returns the transcript so far."""
+        if self.decoder.AcceptWaveform(chunk):
+            # A pause ended a segment inside the utterance, keep its words
+            segment = json.loads(self.decoder.Result()).get("text", "")
+            self.text = " ".join(filter(None, [self.text, clean_transcript(segment)]))
+            return self.spoken_answers.restore(self.text)
+        partial = clean_transcript(json.loads(self.decoder.PartialResult()).get("partial", ""))
+        return self.spoken_answers.restore(" ".join(filter(None, [self.text, partial])))
+
+    def finish(self):
+        final = clean_transcript(json.loads(self.decoder.FinalResult()).get("text", ""))
+        return self.spoken_answers.restore(" ".join(filter(None, [self.text, final])))
+
+
+class SphinxRecognizer:
+    """Offline recognition with CMU PocketSphinx, spotting the accepted answers as keywords."""
+    uses_grammar = True
+
+    def __init__(self, language="en-US", sensitivity=0.8, recognizer=None):
+        self.language = language
+        self.sensitivity = sensitivity
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def recognize(self, audio, on_partial=None, phrases=None):
+        spoken_answers = SpokenAnswers(phrases)
+        keywords = [(form, self.sensitivity) for form in spoken_answers.vocabulary] or None
+        text = self.recognizer.recognize_sphinx(audio, language=self.language, keyword_entries=keywords).strip()
+        return spoken_answers.restore(text)
+
+
+class TranscriptRecognizer:
+    """Test recognizer for FakeAudioSource: the utterance already is the transcript.
+
+    Reports the transcript word by word as partial results, like a streaming recognizer would.
+    """
+    uses_grammar = False
+
+    def __init__(self, word_delay=0.0):
+        self.word_delay = word_delay
+
+    def start_stream(self, phrases=None, sample_rate=None):
+        return TranscriptStream()
+
+    def recognize(self, transcript, on_partial=None, phrases=None):
+        if not transcript:
+            raise sr.UnknownValueError()
+        words = transcript.split()
+        for count in range(1, len(words)):
+            time.sleep(self.word_delay)
+            if on_partial is not None:
+                on_partial(" ".join(words[:count]))
+        return transcript
+
+
+class TranscriptStream:
+    """Streaming counterpart of TranscriptRecognizer; FakeAudioSource feeds it one word at a time."""
+
+    def __init__(self):
+        self.words = []
+
+    def feed(self, word):
+        self.words.append(word)
+        return " ".join(self.words)
+
+    def finish(self):
+        return " ".join(self.words)
+
+
+def listen_for_answer(source, recognizer, stop_event, phrases=None, matcher=None, timeout=10,
+                      phrase_time_limit=5, on_chunk=None, on_partial=None, keep_pre_roll=True, timer=None):
+    """Captures and transcribes one answer, ending as soon as it confidently matches an accepted one.
+
+    With a streaming recognizer (one that has start_stream), accepted phrases and a matcher,
+    audio is decoded while it is captured and every interim transcript is scored against the
+    phrases; the first one the matcher accepts ends the capture without waiting for the pause
+    or the phrase time limit. Otherwise the whole utterance is captured and then recognized.
+    Only VoskRecognizer streams: with the default GoogleRecognizer (and with Sphinx) an answer
+    still ends at the pause or the phrase time limit, so early endpointing needs
+    "speech_recognizer": "vosk" in the config.
+    Returns None if nothing was said and raises sr.UnknownValueError if nothing was understood.
+    An optional AnswerTimer gets the time spent waiting for speech as input_wait and the
+    time spent decoding it as recognition.
+    """
+    if not (phrases and matcher is not None and hasattr(recognizer, 'start_stream')):
+        with timed(timer, "input_wait"):
+            audio = source.capture(stop_event, timeout, phrase_time_limit, on_chunk=on_chunk,
+                                   keep_pre_roll=keep_pre_roll)
+        if audio is None:
+            return None
+        with timed(timer, "recognition"):
+            return recognizer.recognize(audio, on_partial=on_partial, phrases=phrases)
+
+    stream = recognizer.start_stream(phrases, getattr(source, 'sample_rate', None))
+    matched = []
+    decoding_ns = [0]  # Decoding runs inside the capture; kept apart from input_wait
+
+    def on_frame(chunk):
+        start = time.perf_counter_ns()
+        partial = stream.feed(chunk)
+        decoding_ns[0] += time.perf_counter_ns() - start
+        if not partial:
+            return False
+        if on_partial is not None:
+            on_partial(partial)
+        if matcher.best_match(partial, phrases) is not None:
+            matched.append(partial)
+            return True
+        return False
+
+    capture_start = time.perf_counter_ns()
+    audio = source.capture(stop_event, timeout, phrase_time_limit, on_chunk=on_chunk,
+                           keep_pre_roll=keep_pre_roll, on_frame=on_frame)
+    if timer is not None:
+        timer.add("input_wait", time.perf_counter_ns() - capture_start - decoding_ns[0])
+        timer.add("recognition", decoding_ns[0])
+    if audio is None:
+        return None
+    with timed(timer, "recognition"):
+        text = matched[0] if matched else stream.finish()
+    if not text:
+        raise sr.UnknownValueError()
+    return text
+
+
+def create_recognizer(config, recognizer=None, language="en-IN"):
+    """Creates the speech recognizer selected by config['speech_recognizer'] (google, vosk or sphinx).
+
+    The offline backends need packages that are not installed by default (see the end of
+    requirements.txt): vosk plus a model downloaded to config['vosk_model_path'], or pocketsphinx.
+    """
+    name = config.get('speech_recognizer', 'google')
+    if name == 'google':
+        return GoogleRecognizer(language, recognizer)
+    if name == 'vosk':
+        return VoskRecognizer(config['vosk_model_path'], recognizer)
+    if name == 'sphinx':
+        return SphinxRecognizer(config.get('sphinx_language', 'en-US'), recognizer=recognizer)
+    raise ValueError(f"Unknown speech recognizer '{name}', expected one of: google, vosk, sphinx")
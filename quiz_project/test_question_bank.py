@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from question_bank import QuestionBank, file_signature, iter_topics
+
+
+LESSON = {
+    "Numbers": [{"question": "Translate", "one": "ek", "two": "do; दो@Hindi"}, {"3.25": -1e-3, "n": 12345678}],
+    "Escapes \"quoted\" \\ topic": [{"q": "line\nbreak é 😀", "empty": ""}],
+    "Empty": [],
+    "Nested": {"not": ["a", {"list": [1, 2.5, None, True, False]}]},
+    "Last": [{"question": "}{][,:", "a": "b"}],
+}
+
+
+def write_lesson(path, lesson, indent=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(lesson, f, ensure_ascii=False, indent=indent)
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 2, 3, 7, 64, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_iter_topics_matches_json_load(tmp_path, chunk_chars, indent):
+    path = str(tmp_path / "lesson.json")
+    write_lesson(path, LESSON, indent)
+    with open(path, 'r', encoding='utf-8') as f:
+        expected = list(json.load(f).items())
+    assert list(iter_topics(path, chunk_chars)) == expected
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 5, 1 << 20])
+def test_iter_topics_of_an_empty_lesson(tmp_path, chunk_chars):
+    path = tmp_path / "lesson.json"
+    path.write_text(" { \n } ", encoding='utf-8')
+    assert list(iter_topics(str(path), chunk_chars)) == []
+
+
+def test_iter_topics_rejects_a_truncated_lesson(tmp_path):
+    path = tmp_path / "lesson.json"
+    path.write_text('{"Topic": [{"a": "b"}', encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iter_topics(str(path), 4))
+
+
+def answers(bank, lesson, topic):
+    return [part.answers for question in bank.questions(lesson, topic) for part in question.parts]
+
+
+def test_stale_index_is_rebuilt_after_the_file_signature_changes(tmp_path):
+    learning_section = tmp_path / "learning_section"
+    learning_section.mkdir()
+    path = str(learning_section / "lesson.json")
+    write_lesson(path, {"Topic": [{"one": "ek"}]})
+    QuestionBank(str(learning_section)).close()
+
+    # Same size and mtime, but a new file: only ctime and inode tell it apart
+    stat = os.stat(path)
+    os.remove(path)
+    write_lesson(path, {"Topic": [{"one": "do"}]})
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert file_signature(path)[:2] == [stat.st_mtime_ns, stat.st_size]
+
+    bank = QuestionBank(str(learning_section))
+    assert answers(bank, "lesson", "Topic") == [("do",)]
+    assert bank.header["lessons"]["lesson"]["signature"] == file_signature(path)
+
+    # A change while the bank is open is noticed on the next access of the lesson
+    write_lesson(path, {"Topic": [{"one": "ek"}], "Added": [{"two": "do"}]})
+    assert bank.topics("lesson") == ["Topic", "Added"]
+    assert answers(bank, "lesson", "Added") == [("do",)]
+    bank.close()
+
+
+def test_unchanged_lessons_are_not_recompiled(tmp_path, monkeypatch):
+    learning_section = tmp_path / "learning_section"
+    learning_section.mkdir()
+    write_lesson(str(learning_section / "a.json"), {"Topic": [{"one": "ek"}]})
+    write_lesson(str(learning_section / "b.json"), {"Topic": [{"two": "do"}]})
+    QuestionBank(str(learning_section)).close()
+
+    compiled = []
+    original = QuestionBank._compile_lesson
+    monkeypatch.setattr(QuestionBank, "_compile_lesson",
+                        lambda self, out, path: compiled.append(os.path.basename(path)) or original(self, out, path))
+    write_lesson(str(learning_section / "b.json"), {"Topic": [{"two": "teen"}]})
+    bank = QuestionBank(str(learning_section))
+    assert compiled == ["b.json"]
+    assert answers(bank, "a", "Topic") == [("ek",)]
+    assert answers(bank, "b", "Topic") == [("teen",)]
+    bank.close()
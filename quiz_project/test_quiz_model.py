@@ -0,0 +1,17 @@
+import pytest
+
+from quiz_model import normalize_answer
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("  The  Answer! ", "the answer"),
+    ("Well-known.", "wellknown"),
+    ("-5", "-5"),
+    ("minus -5 degrees", "minus -5 degrees"),
+    ("3.5", "3.5"),
+    ("It is 3.5.", "it is 3.5"),
+    ("1,000", "1000"),
+    ("x - 5", "x 5"),
+])
+def test_normalize_answer_keeps_signs_and_decimal_points(text, expected):
+    assert normalize_answer(text) == expected
@@ -0,0 +1,90 @@
+import json
+import os
+
+from results_store import ResultsStore, open_results_store
+
+
+GUI_RESULTS = [
+    {"date_time": "2024-03-01 10:00:00", "correct_answers": 3, "incorrect_answers": 1, "time_taken": 1.5,
+     "wrong_questions_with_answers": [{"question": "two", "correct_answer": "do"}]},
+    {"date_time": "2024-03-02 10:00:00", "correct_answers": 4, "incorrect_answers": 0, "time_taken": 1.0},
+]
+CLI_RESULTS = [
+    {"date_time": "09:30:00 05-03-2024", "correct_answers": 2, "wrong_answers": 0, "time_taken_minutes": 0.5,
+     "practice_sessions": 1},
+]
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_legacy_json_results_are_imported_on_first_use(tmp_path):
+    results_directory = str(tmp_path / "results")
+    write_json(os.path.join(results_directory, "hindi_numbers_results.json"), GUI_RESULTS)
+    write_json(os.path.join(results_directory, "learning_counts.json"), {"hindi": {"numbers": 2}})
+    write_json(os.path.join(results_directory, "languages", "hindi", "colours", "result.json"), CLI_RESULTS)
+    learning_data_file = str(tmp_path / "learning_data.json")
+    write_json(learning_data_file, {"languages": {"hindi": {"colours ": 5, "unseen": 0}}})
+
+    store = open_results_store({"results_directory": results_directory}, learning_data_file=learning_data_file)
+
+    assert store.sessions("", "hindi", "numbers") == [
+        {"date_time": "2024-03-01 10:00:00", "time_taken_minutes": 1.5, "correct_answers": 3, "wrong_answers": 1,
+         "practice_sessions": None, "wrong_questions_with_answers": [{"question": "two", "correct_answer": "do"}]},
+        {"date_time": "2024-03-02 10:00:00", "time_taken_minutes": 1.0, "correct_answers": 4, "wrong_answers": 0,
+         "practice_sessions": None, "wrong_questions_with_answers": []},
+    ]
+    assert store.sessions("languages", "hindi", "colours") == [
+        {"date_time": "09:30:00 05-03-2024", "time_taken_minutes": 0.5, "correct_answers": 2, "wrong_answers": 0,
+         "practice_sessions": 1, "wrong_questions_with_answers": []},
+    ]
+    # Legacy dates are also stored in ISO format, so sessions of all variants sort together
+    assert [row[0] for row in store.conn.execute("SELECT recorded_at FROM sessions ORDER BY recorded_at")] == [
+        "2024-03-01T10:00:00", "2024-03-02T10:00:00", "2024-03-05T09:30:00"]
+    assert store.learning_counts() == {"": {"hindi": {"numbers": 2}}, "languages": {"hindi": {"colours": 5}}}
+    store.close()
+
+
+def test_reimport_replaces_changed_files_and_skips_unchanged_ones(tmp_path):
+    results_directory = str(tmp_path / "results")
+    results_file = os.path.join(results_directory, "my_lesson_first_topic_results.json")
+    write_json(results_file, GUI_RESULTS[:1])
+    store = ResultsStore(str(tmp_path / "results.db"))
+
+    assert store.import_json_results(results_directory, lessons=["my_lesson"]) == 1
+    assert store.import_json_results(results_directory, lessons=["my_lesson"]) == 0
+    assert len(store.sessions("", "my_lesson", "first_topic")) == 1
+
+    write_json(results_file, GUI_RESULTS)
+    assert store.import_json_results(results_directory, lessons=["my_lesson"]) == 1
+    assert [session["correct_answers"] for session in store.sessions("", "my_lesson", "first_topic")] == [3, 4]
+    store.close()
+
+
+def test_journal_rebuilds_the_sessions_of_a_lost_database(tmp_path):
+    config = {"results_directory": str(tmp_path / "results")}
+    store = open_results_store(config, learning_data_file=None)
+    store.record_session("languages", "hindi", "numbers", GUI_RESULTS[0])
+    store.record_session("", "hindi", "colours", CLI_RESULTS[0])
+    expected = [store.sessions("languages", "hindi", "numbers"), store.sessions("", "hindi", "colours")]
+    store.close()
+
+    journal_file = os.path.join(config["results_directory"], "sessions.jsonl")
+    with open(journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"category": "", "lesson": "cut off')  # A crash in the middle of an append
+    for name in os.listdir(config["results_directory"]):
+        if name.startswith("results.db"):
+            os.remove(os.path.join(config["results_directory"], name))
+
+    store = open_results_store(config, learning_data_file=None)
+    assert [store.sessions("languages", "hindi", "numbers"), store.sessions("", "hindi", "colours")] == expected
+    store.record_session("", "hindi", "colours", CLI_RESULTS[0])  # Starts on a new line after the torn one
+    store.close()
+    # The torn line is skipped, the new session is read back
+    rebuilt = ResultsStore(str(tmp_path / "rebuilt.db"))
+    assert rebuilt.import_journal(journal_file) == 3
+    assert len(rebuilt.sessions("", "hindi", "colours")) == 2
+    rebuilt.close()
@@ -0,0 +1,78 @@
+import pytest
+
+from quiz_model import Question
+from results_store import ResultsStore
+from scheduler import DAY_SECONDS, MIN_EASE, RESULT_QUALITY, Card, ReviewScheduler
+
+
+# quality, repetitions and interval before the review -> interval, repetitions, lapses and ease after it
+SM2_TABLE = [
+    (5, 0, 0.0, 1.0, 1, 0, 2.6),
+    (4, 0, 0.0, 1.0, 1, 0, 2.5),
+    (3, 0, 0.0, 1.0, 1, 0, 2.36),
+    (4, 1, 1.0, 6.0, 2, 0, 2.5),
+    (4, 2, 6.0, 15.0, 3, 0, 2.5),
+    (5, 3, 15.0, 38.0, 4, 0, 2.6),
+    (3, 3, 15.0, 38.0, 4, 0, 2.36),
+    (2, 3, 15.0, 1.0, 0, 1, 2.18),
+    (1, 3, 15.0, 1.0, 0, 1, 1.96),
+    (0, 3, 15.0, 1.0, 0, 1, 1.7),
+]
+
+
+@pytest.mark.parametrize("quality, repetitions, interval, expected_interval, expected_repetitions, "
+                         "expected_lapses, expected_ease", SM2_TABLE)
+def test_review_follows_the_sm2_table(quality, repetitions, interval, expected_interval, expected_repetitions,
+                                      expected_lapses, expected_ease):
+    card = Card("", "lesson", "topic", "prompt", interval_days=interval, repetitions=repetitions)
+    card.review(quality, now=1000.0)
+    assert card.interval_days == expected_interval
+    assert card.repetitions == expected_repetitions
+    assert card.lapses == expected_lapses
+    assert card.ease == pytest.approx(expected_ease)
+    assert card.reviewed_at == 1000.0
+    assert card.due_at == 1000.0 + expected_interval * DAY_SECONDS
+
+
+def test_ease_never_drops_below_the_minimum():
+    card = Card("", "lesson", "topic", "prompt")
+    for _ in range(10):
+        card.review(0, now=0.0)
+    assert card.ease == MIN_EASE
+
+
+def test_quiz_results_map_to_sm2_grades():
+    assert [RESULT_QUALITY[result] for result in ("correct", "correct after practice", "wrong")] == [4, 2, 1]
+
+
+def questions(*prompts):
+    return [Question.from_dict({prompt: "answer"}) for prompt in prompts]
+
+
+def test_session_asks_due_questions_most_overdue_first_then_new_ones(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"))
+    scheduler = ReviewScheduler(store, new_cards_per_session=1)
+    scheduler.record_session("", "lesson", "topic", [
+        {"question": "a", "result": "correct"},
+        {"question": "b", "result": "wrong"},
+        {"question": "c", "result": "correct"},
+    ], now=0.0)  # All due after a day; a and c are reviewed again and pushed back by six days
+    scheduler.record_session("", "lesson", "topic", [{"question": "a", "result": "correct"}], now=10.0)
+    scheduler.record_session("", "lesson", "topic", [{"question": "c", "result": "correct"}], now=5.0)
+
+    topic = questions("a", "b", "c", "new 1", "new 2")
+    session = scheduler.session("", "lesson", "topic", topic, now=DAY_SECONDS / 2)
+    assert session in (topic[3:4], topic[4:5])  # Nothing due yet, one of the new questions
+
+    session = scheduler.session("", "lesson", "topic", topic, now=DAY_SECONDS + 1)
+    assert [question.parts[0].prompt for question in session[:1]] == ["b"]
+    assert session[1:] in (topic[3:4], topic[4:5])
+    assert scheduler.next_due("", "lesson", "topic") == DAY_SECONDS
+
+    # The cards are persisted: a new scheduler on the same store sees the same schedule
+    reloaded = ReviewScheduler(store, new_cards_per_session=0)
+    assert [question.parts[0].prompt for question in
+            reloaded.session("", "lesson", "topic", topic, now=DAY_SECONDS + 1)] == ["b"]
+    assert [question.parts[0].prompt for question in
+            reloaded.session("", "lesson", "topic", topic, now=6 * DAY_SECONDS + 10)] == ["b", "c", "a"]
+    store.close()
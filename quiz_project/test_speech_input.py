@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from answer_matcher import AnswerMatcher
+from speech_input import FakeAudioSource, TranscriptRecognizer, TranscriptStream, listen_for_answer
+
+
+class RecordingRecognizer(TranscriptRecognizer):
+    """Keeps the stream it handed out, to see how much of the utterance was consumed."""
+
+    def start_stream(self, phrases=None, sample_rate=None):
+        self.stream = TranscriptStream()
+        return self.stream
+
+
+def test_listen_for_answer_ends_at_the_first_matching_partial():
+    recognizer = RecordingRecognizer()
+    partials = []
+    text = listen_for_answer(FakeAudioSource(["new delhi is the capital"]), recognizer, threading.Event(),
+                             phrases=["new delhi"], matcher=AnswerMatcher(90), on_partial=partials.append)
+    assert text == "new delhi"
+    assert partials == ["new", "new delhi"]
+    assert recognizer.stream.words == ["new", "delhi"]  # The rest of the utterance was never decoded
+
+
+def test_listen_for_answer_without_a_match_uses_the_whole_utterance():
+    text = listen_for_answer(FakeAudioSource(["mumbai i think"]), RecordingRecognizer(), threading.Event(),
+                             phrases=["new delhi"], matcher=AnswerMatcher(90))
+    assert text == "mumbai i think"
+
+
+def test_listen_for_answer_without_a_matcher_recognizes_after_the_capture():
+    partials = []
+    text = listen_for_answer(FakeAudioSource(["new delhi is the capital"]), TranscriptRecognizer(),
+                             threading.Event(), phrases=["new delhi"], on_partial=partials.append)
+    assert text == "new delhi is the capital"
+    assert partials == ["new", "new delhi", "new delhi is", "new delhi is the"]
+
+
+def test_listen_for_answer_returns_none_on_silence():
+    assert listen_for_answer(FakeAudioSource([None]), TranscriptRecognizer(), threading.Event()) is None
+    assert listen_for_answer(FakeAudioSource([]), TranscriptRecognizer(), threading.Event()) is None
+
+
+def run_worker(worker):
+    """Runs a RecognitionWorker thread and returns the signals it emitted, in order."""
+    from PyQt5.QtCore import QCoreApplication
+    app = QCoreApplication.instance() or QCoreApplication([])
+    emitted = []
+    worker.partial.connect(lambda text: emitted.append(("partial", text)))
+    worker.recognized.connect(lambda text: emitted.append(("recognized", text)))
+    worker.failed.connect(lambda message: emitted.append(("failed", message)))
+    worker.start()
+    assert worker.wait(5000)
+    app.processEvents()  # Delivers the queued signals
+    return emitted
+
+
+def test_recognition_worker_emits_partials_then_the_recognized_answer():
+    pytest.importorskip("PyQt5")
+    from recognition_worker import RecognitionWorker
+    worker = RecognitionWorker(FakeAudioSource(["New Delhi is the capital"]), TranscriptRecognizer(),
+                               phrases=["new delhi"], matcher=AnswerMatcher(90), postprocess=str.title)
+    assert run_worker(worker) == [("partial", "New"), ("partial", "New Delhi"), ("recognized", "New Delhi")]
+
+
+def test_recognition_worker_reports_failures():
+    pytest.importorskip("PyQt5")
+    from recognition_worker import RecognitionWorker
+
+    emitted = run_worker(RecognitionWorker(FakeAudioSource([None]), TranscriptRecognizer()))
+    assert emitted == [("failed", "No speech was detected. Please try speaking again.")]
+
+    emitted = run_worker(RecognitionWorker(FakeAudioSource([""]), TranscriptRecognizer()))
+    assert emitted == [("failed", "Sorry, I did not understand that. Please try again.")]
+
+    def translate(text):
+        raise ValueError("translator is unavailable")
+
+    emitted = run_worker(RecognitionWorker(FakeAudioSource(["paris"]), TranscriptRecognizer(), postprocess=translate))
+    assert emitted == [("failed", "Speech recognition failed: translator is unavailable")]
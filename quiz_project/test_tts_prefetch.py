@@ -0,0 +1,66 @@
+from tts_cache import AudioCache
+from tts_engines import StubEngine
+from tts_prefetch import SpeechPrefetcher
+
+
+def test_prefetch_synthesizes_each_upcoming_text_once(tmp_path):
+    engine = StubEngine(delay=0.01)
+    cache = AudioCache(str(tmp_path), extension=engine.extension)
+    ready = []
+    prefetcher = SpeechPrefetcher(cache, engine, on_ready=ready.append)
+    texts = ["one", "two", "three"]
+
+    prefetcher.prefetch(texts, 'hi')
+    prefetcher.prefetch(texts + ["one"], 'hi')  # Queued or cached texts are skipped
+    paths = [prefetcher.clip(text, 'hi') for text in texts]
+    prefetcher.close()
+
+    assert sorted(engine.synthesized) == sorted(texts)
+    assert sorted(ready) == sorted(paths)
+    assert paths == [cache.path_for(text, 'hi', engine.name) for text in texts]
+
+
+def test_clips_are_served_from_the_cache_after_a_prefetch(tmp_path):
+    engine = StubEngine()
+    cache = AudioCache(str(tmp_path), extension=engine.extension)
+    prefetcher = SpeechPrefetcher(cache, engine)
+    prefetcher.prefetch(["one", "two"], 'hi')
+    prefetcher.close()
+
+    def synthesize_again(path):
+        raise AssertionError("a prefetched clip was synthesized again")
+
+    assert cache.get_or_create("one", 'hi', engine.name, synthesize_again) == cache.path_for("one", 'hi', engine.name)
+    assert SpeechPrefetcher(cache, engine).clip("two", 'hi') == cache.path_for("two", 'hi', engine.name)
+    SpeechPrefetcher(cache, engine).prefetch(["one", "two"], 'hi')
+    assert sorted(engine.synthesized) == ["one", "two"]
+
+
+def test_clip_waits_for_a_running_prefetch(tmp_path):
+    engine = StubEngine(delay=0.2)
+    cache = AudioCache(str(tmp_path), extension=engine.extension)
+    prefetcher = SpeechPrefetcher(cache, engine, workers=1)
+    prefetcher.prefetch(["slow"], 'hi')
+    path = prefetcher.clip("slow", 'hi')  # Still synthesizing: waits instead of starting a second one
+    prefetcher.close()
+
+    assert path == cache.path_for("slow", 'hi', engine.name)
+    assert engine.synthesized == ["slow"]
+
+
+def test_clip_async_never_blocks_and_shares_running_syntheses(tmp_path):
+    engine = StubEngine(delay=0.2)
+    cache = AudioCache(str(tmp_path), extension=engine.extension)
+    prefetcher = SpeechPrefetcher(cache, engine)
+    prefetcher.prefetch(["next"], 'hi')
+
+    missing = prefetcher.clip_async("now", 'hi')
+    assert not missing.done()
+    assert prefetcher.clip_async("now", 'hi') is missing
+    assert not prefetcher.clip_async("next", 'hi').done()  # The running prefetch
+
+    assert missing.result() == cache.path_for("now", 'hi', engine.name)
+    cached = prefetcher.clip_async("now", 'hi')
+    assert cached.done() and cached.result() == missing.result()
+    prefetcher.close()
+    assert sorted(engine.synthesized) == ["next", "now"]
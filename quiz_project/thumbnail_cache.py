@@ -0,0 +1,135 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thumbnail_cache")
+DEFAULT_SIZE = 300
+
+
+class ThumbnailCache:
+    """On-disk cache of scaled-down question images.
+
+    A thumbnail is stored as <sha256 of the image path, mtime, file size and thumbnail
+    size>.png, so an edited image gets a new thumbnail and the full image is only
+    decoded once. JPEGs are decoded at reduced scale right away (PIL's draft mode).
+    """
+
+    def __init__(self, cache_directory=DEFAULT_CACHE_DIRECTORY, size=DEFAULT_SIZE):
+        self.cache_directory = cache_directory
+        self.size = size
+
+    def path_for(self, image_path):
+        """Returns where the thumbnail of an existing image is (or would be) stored."""
+        stat = os.stat(image_path)
+        key = f"{os.path.abspath(image_path)}\0{stat.st_mtime_ns}\0{stat.st_size}\0{self.size}"
+        return os.path.join(self.cache_directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + ".png")
+
+    def get_or_create(self, image_path):
+        """Returns the thumbnail path of an image, creating it on a miss; None if the image doesn't exist."""
+        try:
+            path = self.path_for(image_path)
+        except OSError:
+            return None
+        if os.path.exists(path):
+            return path
+
+        from PIL import Image, ImageOps  # Only loaded once a thumbnail actually has to be made
+        os.makedirs(self.cache_directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with Image.open(image_path) as image:
+                image.draft('RGB', (self.size, self.size))
+                thumbnail = ImageOps.exif_transpose(image)
+                thumbnail.thumbnail((self.size, self.size))
+                if thumbnail.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+                    thumbnail = thumbnail.convert('RGB')
+                thumbnail.save(temp_path, format='PNG')
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return path
+
+
+class ThumbnailLoader:
+    """Loads thumbnails in background threads and keeps the decoded ones in a memory LRU.
+
+    get() never blocks: it returns the decoded thumbnail if it is in memory and otherwise
+    queues it, calling on_ready(image_path) from the worker thread once it is available
+    (Qt code must hand that over to the GUI thread, e.g. with a queued signal). decode
+    turns a thumbnail file into what is kept in memory, e.g. QImage; by default the
+    thumbnail path itself is kept.
+    """
+
+    def __init__(self, thumbnail_cache, decode=None, workers=2, max_items=64, on_ready=None):
+        self.thumbnail_cache = thumbnail_cache
+        self.decode = decode
+        self.max_items = max_items
+        self.on_ready = on_ready
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        self._decoded = OrderedDict()  # image path -> decoded thumbnail, None if the image is missing
+        self._pending = {}  # image path -> Future of the decoded thumbnail
+        self._lock = threading.Lock()
+
+    def _load(self, image_path):
+        # Any failure (unreadable file, PIL's decompression bomb check, ...) is kept as a missing
+        # image, so the view shows its fallback and the path isn't stuck as pending
+        try:
+            thumbnail_path = self.thumbnail_cache.get_or_create(image_path)
+            decoded = thumbnail_path
+            if thumbnail_path is not None and self.decode is not None:
+                decoded = self.decode(thumbnail_path)
+        except Exception as e:
+            print(f"Error creating thumbnail of {image_path}: {e}")
+            decoded = None
+        with self._lock:
+            self._decoded[image_path] = decoded
+            if len(self._decoded) > self.max_items:
+                self._decoded.popitem(last=False)
+            self._pending.pop(image_path, None)
+        if self.on_ready is not None:
+            self.on_ready(image_path)
+        return decoded
+
+    def _queue(self, image_path):
+        """Queues a load unless the thumbnail is in memory or queued; must hold the lock."""
+        if image_path in self._decoded or image_path in self._pending:
+            return
+        self._pending[image_path] = self._executor.submit(self._load, image_path)
+
+    def get(self, image_path):
+        """Returns (True, thumbnail) if it is in memory, else queues it and returns (False, None)."""
+        with self._lock:
+            if image_path in self._decoded:
+                self._decoded.move_to_end(image_path)
+                return True, self._decoded[image_path]
+            self._queue(image_path)
+            return False, None
+
+    def prefetch(self, image_paths):
+        """Queues thumbnails of upcoming images that are neither in memory nor queued."""
+        with self._lock:
+            for image_path in image_paths:
+                self._queue(image_path)
+
+    def load(self, image_path):
+        """Returns the thumbnail, waiting for it if it isn't in memory yet."""
+        with self._lock:
+            if image_path in self._decoded:
+                self._decoded.move_to_end(image_path)
+                return self._decoded[image_path]
+            self._queue(image_path)
+            future = self._pending[image_path]
+        return future.result()
+
+    def close(self):
+        """Drops queued loads and waits for the running ones."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def open_thumbnail_cache(config, size=DEFAULT_SIZE):
+    """Opens the thumbnail cache for a loaded config dict, storing thumbnails that fit size x size."""
+    return ThumbnailCache(config.get('thumbnail_cache_directory', DEFAULT_CACHE_DIRECTORY), size)
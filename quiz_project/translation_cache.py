@@ -0,0 +1,155 @@
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from quiz_model import normalize_answer
+
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_cache.json")
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_SAVE_DELAY = 5.0  # Seconds
+
+
+def load_dictionary(dictionary_file):
+    """Loads an offline {phrase: translation} dictionary, keyed by normalized phrase."""
+    if not dictionary_file:
+        return {}
+    try:
+        with open(dictionary_file, 'r', encoding='utf-8') as f:
+            return {normalize_answer(phrase): translation for phrase, translation in json.load(f).items()}
+    except (OSError, json.JSONDecodeError, AttributeError) as e:
+        print(f"Error reading translation dictionary {dictionary_file}: {e}")
+        return {}
+
+
+class TranslationCache:
+    """Persistent LRU cache in front of a translator.
+
+    Lookups go to the offline dictionary first, then to the cache (keyed by destination
+    language and normalized text, so casing and punctuation don't cause misses) and only
+    then to the translator, whose result is cached. translator is anything with a
+    googletrans-style translate(text_or_list, dest=...) method, or None to work offline.
+    New translations are written to disk together, save_delay seconds after the first of
+    them (right away with a save_delay of 0); call save() before exiting to keep the rest.
+    """
+
+    def __init__(self, translator=None, cache_file=DEFAULT_CACHE_FILE, max_entries=DEFAULT_MAX_ENTRIES,
+                 dictionary=None, dest='en', save_delay=DEFAULT_SAVE_DELAY):
+        self.translator = translator
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.dictionary = dictionary or {}
+        self.dest = dest
+        self.save_delay = save_delay
+        self._lock = threading.Lock()  # Used from the recognition and pre-translation threads
+        self._save_lock = threading.Lock()  # One writer of cache_file at a time
+        self._save_timer = None
+        self._dirty = False
+        self._entries = self._load()
+
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return OrderedDict()
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return OrderedDict(json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading translation cache {self.cache_file}, starting empty: {e}")
+            return OrderedDict()
+
+    def save(self):
+        """Writes unsaved translations to disk with an atomic replace."""
+        if not self.cache_file:
+            return
+        with self._save_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                entries = OrderedDict(self._entries)
+                self._dirty = False
+            temp_file = None
+            try:
+                with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix=".tmp", delete=False,
+                                                 dir=os.path.dirname(os.path.abspath(self.cache_file))) as f:
+                    temp_file = f.name
+                    json.dump(entries, f, ensure_ascii=False)
+                os.replace(temp_file, self.cache_file)
+            except OSError as e:
+                print(f"Error saving translation cache {self.cache_file}: {e}")
+                with self._lock:
+                    self._dirty = True  # Retried by the next save
+            finally:
+                if temp_file is not None and os.path.exists(temp_file):
+                    os.remove(temp_file)
+
+    def key(self, text):
+        return f"{self.dest}:{normalize_answer(text)}"
+
+    def lookup(self, text):
+        """Returns a known translation without calling the translator, or None."""
+        normalized = normalize_answer(text)
+        if normalized in self.dictionary:
+            return self.dictionary[normalized]
+        key = self.key(text)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return None
+
+    def _store(self, pairs):
+        with self._lock:
+            for text, translation in pairs:
+                key = self.key(text)
+                self._entries[key] = translation
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+            if self.save_delay and self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.save)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+        if not self.save_delay:
+            self.save()
+
+    def translate(self, text):
+        """Returns the translation of text, calling the translator only on a miss."""
+        translation = self.lookup(text)
+        if translation is not None:
+            return translation
+        if self.translator is None:
+            return text  # Offline and unknown: compare the answer as it was recognized
+        try:
+            translation = self.translator.translate(text, dest=self.dest).text
+        except Exception as e:
+            # googletrans raises anything from network errors to parse errors; not cached, so retried next time
+            print(f"Error translating answer, comparing it untranslated: {e}")
+            return text
+        self._store([(text, translation)])
+        return translation
+
+    def pretranslate(self, texts):
+        """Translates every unknown text in one batch request, e.g. a topic's accepted answers."""
+        missing = list(OrderedDict.fromkeys(text for text in texts if text and self.lookup(text) is None))
+        if not missing or self.translator is None:
+            return
+        try:
+            results = self.translator.translate(missing, dest=self.dest)
+        except Exception as e:
+            print(f"Error pre-translating answers: {e}")
+            return
+        self._store([(text, result.text) for text, result in zip(missing, results)])
+
+
+def open_translation_cache(config, translator=None):
+    """Opens the translation cache for a loaded config dict."""
+    return TranslationCache(translator, config.get('translation_cache_file', DEFAULT_CACHE_FILE),
+                            config.get('translation_cache_entries', DEFAULT_MAX_ENTRIES),
+                            load_dictionary(config.get('translation_dictionary')),
+                            save_delay=config.get('translation_cache_save_delay', DEFAULT_SAVE_DELAY))
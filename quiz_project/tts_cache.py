@@ -0,0 +1,112 @@
+import hashlib
+import os
+import threading
+
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_cache")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class AudioCache:
+    """Content-addressed cache of synthesized speech files with size-bounded LRU eviction.
+
+    A clip is stored as <sha256 of engine, language and text>.mp3, so the same prompt is
+    only synthesized once and then played straight from disk. A file's mtime is bumped on
+    every hit and the least recently used clips are removed once the cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_directory=DEFAULT_CACHE_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES, extension=".mp3"):
+        self.cache_directory = cache_directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._total_bytes = None  # Computed on the first store
+        self._lock = threading.Lock()  # Clips may be stored from prefetch threads
+
+    def key(self, text, language, engine):
+        """Returns the cache key of a clip."""
+        return hashlib.sha256(f"{engine}\0{language}\0{text}".encode('utf-8')).hexdigest()
+
+    def path_for(self, text, language, engine):
+        """Returns where the clip for text is (or would be) stored."""
+        return os.path.join(self.cache_directory, self.key(text, language, engine) + self.extension)
+
+    def get(self, text, language, engine):
+        """Returns the cached clip path and marks it as recently used, or None on a miss."""
+        path = self.path_for(text, language, engine)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def get_or_create(self, text, language, engine, synthesize):
+        """Returns the clip path, calling synthesize(path) to create it on a miss."""
+        path = self.get(text, language, engine)
+        if path is not None:
+            return path
+
+        path = self.path_for(text, language, engine)
+        os.makedirs(self.cache_directory, exist_ok=True)
+        # Synthesize into a temp file so an interrupted download never leaves a broken clip
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            synthesize(temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self._add_bytes(os.path.getsize(path))
+        return path
+
+    def _entries(self):
+        """Returns (mtime, size, path) of every cached clip."""
+        entries = []
+        if not os.path.isdir(self.cache_directory):
+            return entries
+        for entry in os.scandir(self.cache_directory):
+            if entry.is_file() and entry.name.endswith(self.extension):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def _add_bytes(self, size):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for mtime, size, path in self._entries())
+            else:
+                self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def evict(self):
+        """Removes least recently used clips until the cache fits into max_bytes."""
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError as e:
+                print(f"Error evicting cached audio {path}: {e}")
+        self._total_bytes = total
+
+    def clear(self):
+        """Removes every cached clip."""
+        with self._lock:
+            for mtime, size, path in self._entries():
+                os.remove(path)
+            self._total_bytes = 0
+
+
+def open_audio_cache(config, extension=".mp3"):
+    """Opens the audio cache for a loaded config dict, storing clips of the given file type."""
+    max_mb = config.get('tts_cache_max_mb')
+    return AudioCache(config.get('tts_cache_directory', DEFAULT_CACHE_DIRECTORY),
+                      max_mb * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES, extension)
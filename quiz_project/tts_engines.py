@@ -0,0 +1,132 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TTSEngine(ABC):
+    """Interface of a text-to-speech backend.
+
+    synthesize() returns the encoded clip (mp3/wav) as bytes, ready to be decoded into an
+    in-memory sound; save() writes the same clip to a file for the audio cache. name is part
+    of the cache key and extension is the file type the engine produces.
+    """
+    name = None
+    extension = ".wav"
+
+    @abstractmethod
+    def synthesize(self, text, language):
+        """Returns the clip of text spoken in language as encoded bytes."""
+
+    def save(self, text, language, path):
+        with open(path, 'wb') as f:
+            f.write(self.synthesize(text, language))
+
+
+class GTTSEngine(TTSEngine):
+    """Google Text-to-Speech; needs network access for every new clip."""
+    name = "gtts"
+    extension = ".mp3"
+
+    def synthesize(self, text, language):
+        from gtts import gTTS  # Only needed when something actually gets synthesized
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=language).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class Pyttsx3Engine(TTSEngine):
+    """Offline synthesis through the system voices (espeak, SAPI5 or NSSpeechSynthesizer).
+
+    The pyttsx3 drivers are not thread-safe (NSSpeechSynthesizer must even stay on the
+    thread that created it), so the engine is created and driven on one dedicated thread;
+    save() and synthesize() may be called from any thread, e.g. the prefetch workers.
+    """
+    name = "pyttsx3"
+    extension = ".wav"
+
+    def __init__(self, rate=None):
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyttsx3")
+        self.engine = self._thread.submit(self._init_engine, rate).result()
+
+    @staticmethod
+    def _init_engine(rate):
+        import pyttsx3
+        engine = pyttsx3.init()
+        if rate:
+            engine.setProperty('rate', rate)
+        return engine
+
+    def _select_voice(self, language):
+        """Switches to the first installed voice that speaks language, if any."""
+        for voice in self.engine.getProperty('voices'):
+            languages = [lang.decode('utf-8', 'ignore') if isinstance(lang, bytes) else str(lang)
+                         for lang in (voice.languages or [])]
+            if any(language in lang for lang in languages) or language in voice.id:
+                self.engine.setProperty('voice', voice.id)
+                return
+
+    def _save(self, text, language, path):
+        self._select_voice(language)
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+
+    def save(self, text, language, path):
+        self._thread.submit(self._save, text, language, path).result()
+
+    def synthesize(self, text, language):
+        fd, path = tempfile.mkstemp(suffix=self.extension)
+        os.close(fd)
+        try:
+            self.save(text, language, path)
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+class StubEngine(TTSEngine):
+    """Local stand-in engine that returns a short silent WAV clip after an optional delay.
+
+    Lets the speech pipeline be exercised offline; every synthesized text is recorded in
+    self.synthesized.
+    """
+    name = "stub"
+    extension = ".wav"
+
+    def __init__(self, delay=0.0, duration=0.1, sample_rate=22050):
+        self.delay = delay
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self.synthesized = []
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, language):
+        time.sleep(self.delay)
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as clip:
+            clip.setnchannels(1)
+            clip.setsampwidth(2)
+            clip.setframerate(self.sample_rate)
+            clip.writeframes(b"\0\0" * int(self.duration * self.sample_rate))
+        with self._lock:
+            self.synthesized.append(text)
+        return buffer.getvalue()
+
+
+ENGINES = {
+    "gtts": GTTSEngine,
+    "pyttsx3": Pyttsx3Engine,
+    "stub": StubEngine,
+}
+
+
+def create_tts_engine(name="gtts"):
+    """Creates the TTS backend registered under name."""
+    if name not in ENGINES:
+        raise ValueError(f"Unknown TTS engine '{name}', expected one of: {', '.join(ENGINES)}")
+    return ENGINES[name]()
@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class SpeechPrefetcher:
+    """Synthesizes upcoming prompts in background threads while the current one is answered.
+
+    prefetch() queues texts that are not cached yet; clip() returns the audio file of a
+    text, waiting for its prefetch if one is still running or synthesizing it right away
+    otherwise, and clip_async() does the same without blocking the caller. Every clip ends
+    up in the shared AudioCache; on_ready(path) is called from the worker thread once a
+    prefetched clip exists, e.g. to decode it ahead of playback.
+    """
+
+    def __init__(self, audio_cache, engine, workers=2, on_ready=None):
+        self.audio_cache = audio_cache
+        self.engine = engine
+        self.on_ready = on_ready
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-prefetch")
+        self._pending = {}  # cache key -> Future of the clip path
+        self._lock = threading.Lock()
+
+    def _synthesize(self, text, language):
+        return self.audio_cache.get_or_create(text, language, self.engine.name,
+                                              lambda path: self.engine.save(text, language, path))
+
+    def _prefetch_one(self, text, language):
+        path = self._synthesize(text, language)
+        if self.on_ready is not None:
+            self.on_ready(path)
+        return path
+
+    def prefetch(self, texts, language='en'):
+        """Queues synthesis of every text that is neither cached nor already queued."""
+        for text in texts:
+            key = self.audio_cache.key(text, language, self.engine.name)
+            with self._lock:
+                if key in self._pending or self.audio_cache.get(text, language, self.engine.name):
+                    continue
+                future = self._executor.submit(self._prefetch_one, text, language)
+                self._pending[key] = future
+            future.add_done_callback(lambda done, key=key: self._forget(key))
+
+    def _forget(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def clip(self, text, language='en'):
+        """Returns the audio file for text, blocking only if it isn't ready yet."""
+        key = self.audio_cache.key(text, language, self.engine.name)
+        with self._lock:
+            future = self._pending.get(key)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception as e:
+                print(f"Prefetching speech failed, retrying: {e}")
+        return self._synthesize(text, language)
+
+    def clip_async(self, text, language='en'):
+        """Returns a Future of the audio file for text, synthesizing it in the background if needed.
+
+        A cached clip gives an already completed Future; a clip that is being prefetched gives
+        the Future of that prefetch.
+        """
+        path = self.audio_cache.get(text, language, self.engine.name)
+        if path is not None:
+            future = Future()
+            future.set_result(path)
+            return future
+        key = self.audio_cache.key(text, language, self.engine.name)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._synthesize, text, language)
+            self._pending[key] = future
+        future.add_done_callback(lambda done: self._forget(key))
+        return future
+
+    def close(self):
+        """Drops queued prefetches and waits for the running ones."""
+        self._executor.shutdown(wait=True, cancel_futures=True)